@@ -3,9 +3,11 @@ import { UnifiedResearchAgent } from '@/app/lib/models/unified-research-agent';
 import { env } from '@/app/lib/env';
 import { modelRegistry } from '@/app/lib/models/providers';
 
-// Add a simple logger utility for API routes
-const apiLogger = (message: string, data?: any) => {
+// Add a simple logger utility for API routes. Pass a function as data to build the
+// payload only when logging is enabled
+const apiLogger = (message: string, data?: any | (() => any)) => {
   if (env.IS_DEV) {
+    if (typeof data === 'function') data = data();
     const timestamp = new Date().toISOString().substring(11, 19);
     if (data) {
       console.log(`[${timestamp}] 🔌 [API] ${message}`, data);
@@ -43,13 +45,13 @@ export async function POST(req: NextRequest) {
     // Extract query parameters
     const { query, options = { isDeepResearch: false, depth: 2, breadth: 3 }, modelKey = '' } = await req.json();
     
-    apiLogger('Request parameters', { 
+    apiLogger('Request parameters', () => ({ 
       query: query?.substring(0, 50) + (query?.length > 50 ? '...' : ''),
       isDeepResearch: options.isDeepResearch,
       depth: options.depth,
       breadth: options.breadth,
       model: modelKey
-    });
+    }));
 
     // Validate the model key
     let validatedModelKey = modelKey;
@@ -108,6 +110,10 @@ export async function POST(req: NextRequest) {
           modelKey: validatedModelKey
         });
 
+        // Stop pending searches once the client goes away, so an abandoned run doesn't keep
+        // holding slots in the process-wide Firecrawl limiter that live requests are waiting on
+        req.signal.addEventListener('abort', () => agent.abort());
+
         // Process the query and stream the results
         let chunkCount = 0;
         for await (const chunk of agent.processQueryStream(query, options)) {
@@ -116,6 +122,7 @@ export async function POST(req: NextRequest) {
             await writer.write(encoder.encode(chunk));
           } catch (writeError: unknown) {
             console.error('Error writing chunk to stream:', writeError instanceof Error ? writeError.message : writeError);
+            agent.abort();
             break; // Exit the loop if we can't write
           }
         }
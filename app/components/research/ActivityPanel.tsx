@@ -6,6 +6,10 @@ import { motion, AnimatePresence } from 'framer-motion';
 import { Activity } from './types';
 import { Clock, Search, FileText, Brain, BookOpen, Lightbulb } from 'lucide-react';
 
+// Deep research can log hundreds of activities; only the most recent ones are rendered so
+// each new entry doesn't re-render and animate the whole history
+const MAX_VISIBLE_ACTIVITIES = 100;
+
 interface ActivityPanelProps {
   activities: Activity[];
   isLoading?: boolean;
@@ -16,6 +20,9 @@ export function ActivityPanel({ activities, isLoading = false }: ActivityPanelPr
     return null;
   }
 
+  const hiddenCount = Math.max(0, activities.length - MAX_VISIBLE_ACTIVITIES);
+  const visibleActivities = hiddenCount > 0 ? activities.slice(hiddenCount) : activities;
+
   // Get icon based on activity type
   const getActivityIcon = (type: Activity['type']) => {
     switch (type) {
@@ -51,7 +58,7 @@ export function ActivityPanel({ activities, isLoading = false }: ActivityPanelPr
   };
 
   // Format the timestamp
-  const formatTimestamp = (timestamp: string) => {
+  const formatTimestamp = (timestamp: number) => {
     try {
       const date = new Date(timestamp);
       return date.toLocaleTimeString([], { hour: '2-digit', minute: '2-digit', second: '2-digit' });
@@ -75,7 +82,12 @@ export function ActivityPanel({ activities, isLoading = false }: ActivityPanelPr
         <AnimatePresence initial={false}>
           {activities.length > 0 ? (
             <div className="space-y-4">
-              {activities.map((activity) => (
+              {hiddenCount > 0 && (
+                <p className="text-xs text-muted-foreground text-center">
+                  {hiddenCount} earlier {hiddenCount === 1 ? 'activity' : 'activities'} not shown
+                </p>
+              )}
+              {visibleActivities.map((activity) => (
                 <motion.div
                   key={activity.id}
                   initial={{ opacity: 0, y: 20 }}
@@ -283,8 +283,8 @@ export function Research({ initialQuery = '', researchMode = 'deep-research', mo
       const currentModelKey = modelKey || selectedModel || 'claude-3.7-sonnet';
       
       // Log the model being used
-      console.log(`Using model: ${currentModelKey}`);
-      console.log(`Deep research mode: ${state.isDeepResearch ? 'enabled' : 'disabled'}`);
+      debugLog(`Using model: ${currentModelKey}`);
+      debugLog(`Deep research mode: ${state.isDeepResearch ? 'enabled' : 'disabled'}`);
       
       const response = await fetch('/api/research', {
         method: 'POST',
@@ -307,17 +307,31 @@ export function Research({ initialQuery = '', researchMode = 'deep-research', mo
         throw new Error(error);
       }
       
-      // Process stream
+      // Process stream. Each message is one JSON line, and a read can end partway through
+      // one, so the trailing partial line is held back until the rest of it arrives
       const reader = response.body?.getReader();
       const decoder = new TextDecoder();
+      let partialLine = '';
       
       while (reader) {
         const { done, value } = await reader.read();
         if (done) break;
         
-        const chunk = decoder.decode(value, { stream: true });
-        console.log('Received chunk:', chunk.substring(0, 100) + '...');
-        processStreamData(chunk, state, setState);
+        const chunk = partialLine + decoder.decode(value, { stream: true });
+        const lastNewline = chunk.lastIndexOf('\n');
+        if (lastNewline === -1) {
+          partialLine = chunk;
+          continue;
+        }
+        
+        partialLine = chunk.substring(lastNewline + 1);
+        debugLog('Received chunk', () => chunk.substring(0, 100) + '...');
+        processStreamData(chunk.substring(0, lastNewline), state, setState);
+      }
+      
+      partialLine += decoder.decode();
+      if (partialLine.trim()) {
+        processStreamData(partialLine, state, setState);
       }
     } catch (error) {
       console.error('Error during research:', error);
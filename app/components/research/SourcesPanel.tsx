@@ -1,7 +1,7 @@
 'use client';
 
 import * as React from 'react';
-import { useState } from 'react';
+import { useMemo, useState } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { Source } from './types';
 import { ExternalLink, Globe, Search } from 'lucide-react';
@@ -15,19 +15,20 @@ export function SourcesPanel({ sources, isLoading = false }: SourcesPanelProps)
   const [sortBy, setSortBy] = useState<'relevance' | 'name'>('relevance');
   const [hoveredSourceIndex, setHoveredSourceIndex] = useState<number | null>(null);
 
-  // Skip rendering if no sources
-  if (sources.length === 0 && !isLoading) {
-    return null;
-  }
-
-  // Sort sources based on current sort preference
-  const sortedSources = [...sources].sort((a, b) => {
+  // Sort sources based on current sort preference; memoized because hovering a card
+  // re-renders the panel without changing the sources or the sort order
+  const sortedSources = useMemo(() => [...sources].sort((a, b) => {
     if (sortBy === 'relevance') {
       return (b.relevance || 0) - (a.relevance || 0);
     } else {
       return a.title.localeCompare(b.title);
     }
-  });
+  }), [sources, sortBy]);
+
+  // Skip rendering if no sources
+  if (sources.length === 0 && !isLoading) {
+    return null;
+  }
 
   // Format the relevance for display
   const formatRelevance = (relevance?: number) => {
@@ -3,6 +3,10 @@ import { nanoid } from 'nanoid';
 import { ResearchState, Source, Activity } from './types';
 import { debugLog } from './utils';
 
+// The activity log isn't reset between queries, so only the most recent entries are kept
+// instead of growing (and being copied on every append) for as long as the page is open
+const MAX_STORED_ACTIVITIES = 500;
+
 /**
  * Process the streamed data from the research API
  */
@@ -15,10 +19,68 @@ export function processStreamData(
   const messages = data.trim().split('\n');
 
   // Debug the incoming data
-  debugLog(`Processing ${messages.length} stream messages`, {
+  debugLog(`Processing ${messages.length} stream messages`, () => ({
     dataLength: data.length,
     firstMessagePreview: messages[0]?.substring(0, 50) + '...'
-  });
+  }));
+
+  // Consecutive content chunks from one read are joined and applied in a single state update,
+  // instead of copying the message list and re-concatenating the answer once per chunk
+  let pendingChunks: string[] = [];
+  const flushChunks = () => {
+    if (pendingChunks.length === 0) return;
+    const text = pendingChunks.join('');
+    pendingChunks = [];
+    
+    setState(prevState => {
+      const messages = [...prevState.messages];
+      const lastIndex = messages.length - 1;
+      
+      if (lastIndex >= 0 && messages[lastIndex].role === 'assistant') {
+        // Append to existing message
+        messages[lastIndex] = {
+          ...messages[lastIndex],
+          content: messages[lastIndex].content + text
+        };
+      } else {
+        // Create new assistant message
+        messages.push({
+          id: nanoid(),
+          role: 'assistant',
+          content: text,
+          timestamp: Date.now()
+        });
+      }
+      
+      return {
+        ...prevState,
+        messages,
+        status: 'Generating response...',
+        isLoading: true, // Keep loading while streaming chunks
+      };
+    });
+  };
+
+  // Progress updates arrive in bursts during deep research; only the latest one in a run of
+  // consecutive updates is applied, so the panel re-renders once instead of once per update
+  let pendingProgress: any = null;
+  const flushProgress = () => {
+    if (!pendingProgress) return;
+    const progress = pendingProgress;
+    pendingProgress = null;
+    
+    setState(prevState => ({
+      ...prevState,
+      progress: progress.progress,
+      status: progress.status || prevState.status,
+      isLoading: true, // Ensure loading state continues
+    }));
+    
+    // If we have detailed progress info for deep research, log it
+    if (progress.details) {
+      debugLog('Deep research progress details', progress.details);
+    }
+  };
 
   for (const message of messages) {
     if (!message.trim()) continue;
@@ -27,21 +89,33 @@ export function processStreamData(
       const parsed = JSON.parse(message);
       
       // Log the type of message for debugging
-      debugLog(`Parsed message type: ${parsed.type}`, {
+      debugLog(`Parsed message type: ${parsed.type}`, () => ({
         messageType: parsed.type,
         hasContent: Boolean(parsed.content),
         contentLength: parsed.content ? parsed.content.length : 0
-      });
+      }));
+      
+      // For streaming responses chunk by chunk
+      if (parsed.type === 'content_chunk') {
+        flushProgress();
+        pendingChunks.push(parsed.content || '');
+        continue;
+      }
+      flushChunks();
+      
+      if (parsed.type === 'progress') {
+        pendingProgress = parsed;
+        continue;
+      }
+      flushProgress();
       
       // Process each type of message
       switch (parsed.type) {
         case 'content':
           // Check if we already have an assistant message
-          const existingAssistantMessage = state.messages.find(
-            m => m.role === 'assistant' && state.messages.indexOf(m) === state.messages.length - 1
-          );
+          const lastMessage = state.messages[state.messages.length - 1];
           
-          if (existingAssistantMessage) {
+          if (lastMessage && lastMessage.role === 'assistant') {
             // Update existing message with appended content for streaming effect
             setState(prevState => {
               const updatedMessages = [...prevState.messages];
@@ -82,53 +156,6 @@ export function processStreamData(
           }
           break;
           
-        case 'content_chunk':
-          // For streaming responses chunk by chunk
-          setState(prevState => {
-            const messages = [...prevState.messages];
-            const assistantMessageIndex = messages.findIndex(
-              m => m.role === 'assistant' && messages.indexOf(m) === messages.length - 1
-            );
-            
-            if (assistantMessageIndex >= 0) {
-              // Append to existing message
-              messages[assistantMessageIndex] = {
-                ...messages[assistantMessageIndex],
-                content: messages[assistantMessageIndex].content + parsed.content
-              };
-            } else {
-              // Create new assistant message
-              messages.push({
-                id: nanoid(),
-                role: 'assistant',
-                content: parsed.content || '', // Ensure content is at least an empty string
-                timestamp: Date.now()
-              });
-            }
-            
-            return {
-              ...prevState,
-              messages,
-              status: 'Generating response...',
-              isLoading: true, // Keep loading while streaming chunks
-            };
-          });
-          break;
-          
-        case 'progress':
-          setState(prevState => ({
-            ...prevState,
-            progress: parsed.progress,
-            status: parsed.status || prevState.status,
-            isLoading: true, // Ensure loading state continues
-          }));
-          
-          // If we have detailed progress info for deep research, log it
-          if (parsed.details) {
-            debugLog('Deep research progress details', parsed.details);
-          }
-          break;
-          
         case 'error':
           setState(prevState => ({
             ...prevState,
@@ -150,13 +177,13 @@ export function processStreamData(
               type: 'search',
               status: 'complete',
               message: `Found ${parsed.content?.length || 0} search results`,
-              timestamp: new Date().toISOString()
+              timestamp: Date.now()
             };
             
             return {
               ...prevState,
               searchResults: parsed.content,
-              activities: [...prevState.activities, newActivity],
+              activities: appendActivity(prevState.activities, newActivity),
               status: 'Processing search results with Claude 3.7 Sonnet...',
               progress: 50, // Update progress for better UX
             };
@@ -184,7 +211,7 @@ export function processStreamData(
                 type: 'extract',
                 status: 'complete',
                 message: `Added ${newSources.length} new sources`,
-                timestamp: new Date().toISOString()
+                timestamp: Date.now()
               };
               
               debugLog(`Adding ${newSources.length} new sources`, {
@@ -194,7 +221,7 @@ export function processStreamData(
               return {
                 ...prevState,
                 sources: [...prevState.sources, ...newSources],
-                activities: [...prevState.activities, newActivity],
+                activities: appendActivity(prevState.activities, newActivity),
                 status: newSources.length > 0 
                   ? `Found ${prevState.sources.length + newSources.length} sources...` 
                   : prevState.status
@@ -265,13 +292,13 @@ export function processStreamData(
               type: 'analyze',
               status: 'complete',
               message: parsed.content,
-              timestamp: new Date().toISOString()
+              timestamp: Date.now()
             };
             
             return {
               ...prevState,
               learnings: [...prevState.learnings, parsed.content],
-              activities: [...prevState.activities, newActivity],
+              activities: appendActivity(prevState.activities, newActivity),
               status: 'Learning from sources...'
             };
           });
@@ -295,13 +322,13 @@ export function processStreamData(
                 type: 'synthesis',
                 status: 'complete',
                 message: `Processed ${newLearnings.length} insights from sources`,
-                timestamp: new Date().toISOString()
+                timestamp: Date.now()
               };
                 
               return {
                 ...prevState,
                 learnings: [...prevState.learnings, ...newLearnings],
-                activities: [...prevState.activities, newActivity],
+                activities: appendActivity(prevState.activities, newActivity),
                 status: 'Analyzing learnings...'
               };
             });
@@ -311,10 +338,10 @@ export function processStreamData(
         case 'reasoning_trace':
           // Add the reasoning trace
           if (parsed.content) {
-            debugLog('Received reasoning trace', { 
+            debugLog('Received reasoning trace', () => ({
               length: parsed.content.length,
               traceNumber: state.traces.length + 1
-            });
+            }));
             
             setState(prevState => {
               const newActivity: Activity = {
@@ -322,13 +349,13 @@ export function processStreamData(
                 type: 'reasoning',
                 status: 'complete',
                 message: `Processing reasoning step ${prevState.traces.length + 1}`,
-                timestamp: new Date().toISOString()
+                timestamp: Date.now()
               };
               
               return {
                 ...prevState,
                 traces: [...prevState.traces, parsed.content],
-                activities: [...prevState.activities, newActivity],
+                activities: appendActivity(prevState.activities, newActivity),
                 status: 'Reasoning through the information...'
               };
             });
@@ -346,9 +373,11 @@ export function processStreamData(
           break;
           
         default:
-          console.log('Unknown message type:', parsed.type);
+          debugLog('Unknown message type:', parsed.type);
       }
     } catch (e) {
+      flushChunks();
+      flushProgress();
       console.error('Error parsing stream data:', e);
       console.error('Problematic message:', message.substring(0, 100) + '...');
       
@@ -356,15 +385,13 @@ export function processStreamData(
       if (message.length > 5 && !message.startsWith('{') && !message.startsWith('[')) {
         setState(prevState => {
           const messages = [...prevState.messages];
-          const assistantMessageIndex = messages.findIndex(
-            m => m.role === 'assistant' && messages.indexOf(m) === messages.length - 1
-          );
+          const lastIndex = messages.length - 1;
           
-          if (assistantMessageIndex >= 0) {
+          if (lastIndex >= 0 && messages[lastIndex].role === 'assistant') {
             // Append to existing message as raw text
-            messages[assistantMessageIndex] = {
-              ...messages[assistantMessageIndex],
-              content: messages[assistantMessageIndex].content + message
+            messages[lastIndex] = {
+              ...messages[lastIndex],
+              content: messages[lastIndex].content + message
             };
             
             return {
@@ -379,6 +406,15 @@ export function processStreamData(
       }
     }
   }
+  
+  flushChunks();
+  flushProgress();
+}
+
+// Helper function to append an activity, dropping the oldest once the log is full
+function appendActivity(activities: Activity[], activity: Activity): Activity[] {
+  const start = Math.max(0, activities.length + 1 - MAX_STORED_ACTIVITIES);
+  return [...activities.slice(start), activity];
 }
 
 // Helper function to extract domain from URL
@@ -22,7 +22,8 @@ export interface Activity {
   type: 'search' | 'extract' | 'analyze' | 'reasoning' | 'synthesis' | 'thought';
   status: 'pending' | 'complete' | 'error';
   message: string;
-  timestamp: string;
+  // Epoch milliseconds, formatted only when the activity log renders it
+  timestamp: number;
 }
 
 // State type for research component
@@ -31,9 +31,10 @@ export const getModelDisplayName = (modelKey: string): string => {
     .join(' ');
 };
 
-// Debug logging helper
-export const debugLog = (message: string, data?: any): void => {
+// Debug logging helper; pass a function as `data` on hot paths so the payload is only built
+// when debug output is enabled
+export const debugLog = (message: string, data?: any | (() => any)): void => {
   if (process.env.NODE_ENV === 'development') {
-    console.log(`[DEBUG] ${message}`, data);
+    console.log(`[DEBUG] ${message}`, typeof data === 'function' ? data() : data);
   }
 }; 
\ No newline at end of file
@@ -6,6 +6,33 @@ import { Select, SelectContent, SelectGroup, SelectItem, SelectLabel, SelectTrig
 import { Label } from './label';
 import { MODEL_CONFIGS } from '@/app/lib/models/providers/model-registry';
 
+// MODEL_CONFIGS is static, so models are sorted and grouped by provider once at module load
+// instead of on every render
+const models = Object.entries(MODEL_CONFIGS)
+  .map(([modelKey, config]) => ({
+    modelKey,
+    ...config
+  }))
+  // Sort models by provider and name
+  .sort((a, b) => {
+    if (a.provider === b.provider) {
+      return a.name.localeCompare(b.name);
+    }
+    return a.provider.localeCompare(b.provider);
+  });
+
+// Group models by provider
+const modelsByProvider: Record<string, typeof models> = {};
+models.forEach(model => {
+  if (!modelsByProvider[model.provider]) {
+    modelsByProvider[model.provider] = [];
+  }
+  modelsByProvider[model.provider].push(model);
+});
+
+// Sort providers
+const sortedProviders = Object.keys(modelsByProvider).sort();
+
 export type ModelSelectorProps = {
   value?: string;
   onValueChange?: (value: string) => void;
@@ -25,32 +52,6 @@ export function ModelSelector({
 }: ModelSelectorProps) {
   const [selectedModel, setSelectedModel] = useState<string>(value || 'deepseek-r1');
   
-  // Get ordered models
-  const models = Object.entries(MODEL_CONFIGS).map(([modelKey, config]) => ({
-    modelKey,
-    ...config
-  }));
-  
-  // Sort models by provider and name
-  const sortedModels = models.sort((a, b) => {
-    if (a.provider === b.provider) {
-      return a.name.localeCompare(b.name);
-    }
-    return a.provider.localeCompare(b.provider);
-  });
-  
-  // Group models by provider
-  const modelsByProvider: Record<string, typeof models> = {};
-  models.forEach(model => {
-    if (!modelsByProvider[model.provider]) {
-      modelsByProvider[model.provider] = [];
-    }
-    modelsByProvider[model.provider].push(model);
-  });
-  
-  // Sort providers
-  const sortedProviders = Object.keys(modelsByProvider).sort();
-
   // Update internal state when value prop changes
   useEffect(() => {
     if (value && value !== selectedModel) {
@@ -15,6 +15,35 @@ type EnvStatus = {
   helpMessage?: string;
 };
 
+// The server's env status only changes on restart, so one check is shared by every mount
+// within this window instead of hitting /api/env on each one
+const ENV_CHECK_TTL_MS = 30 * 1000;
+let cachedEnvCheck: { fetchedAt: number; request: Promise<{ ok: boolean; data: any }> } | null = null;
+
+/**
+ * Fetch /api/env, reusing a recent or in-flight response. Failed requests and non-OK
+ * responses (e.g. 503 while env vars are missing) are only shared while in flight, so the
+ * next mount checks again.
+ */
+function fetchEnvCheck(): Promise<{ ok: boolean; data: any }> {
+  if (cachedEnvCheck && Date.now() - cachedEnvCheck.fetchedAt < ENV_CHECK_TTL_MS) {
+    return cachedEnvCheck.request;
+  }
+
+  const request = fetch('/api/env').then(async response => ({
+    ok: response.ok,
+    data: await response.json()
+  }));
+  cachedEnvCheck = { fetchedAt: Date.now(), request };
+  const forget = () => {
+    if (cachedEnvCheck?.request === request) cachedEnvCheck = null;
+  };
+  request.then(result => {
+    if (!result.ok) forget();
+  }, forget);
+  return request;
+}
+
 /**
  * Hook to safely check environment variables without exposing sensitive info
  * Uses the /api/env endpoint to verify environment configuration
@@ -37,11 +66,10 @@ export function useEnvCheck() {
     if (typeof window !== 'undefined') {
       const checkEnv = async () => {
         try {
-          const response = await fetch('/api/env');
-          const data = await response.json();
+          const { ok, data } = await fetchEnvCheck();
           const isDevelopment = data.config?.nodeEnv === 'development';
           
-          if (!response.ok) {
+          if (!ok) {
             // Even if it's not OK but we're in development, we show a warning but allow usage
             if (isDevelopment) {
               setStatus({
@@ -1,7 +1,8 @@
-import { ChatOpenAI } from '@langchain/openai';
 import axios from 'axios';
-import { set } from 'zod';
+import http from 'http';
+import https from 'https';
 import { env } from './env';
+import { readLines } from './utils/streams';
 
 // Use environment variables from our validated env utility
 const OPENROUTER_API_KEY = env.OPENROUTER_API_KEY;
@@ -13,20 +14,33 @@ const APP_URL = env.APP_URL;
 const APP_NAME = env.APP_NAME;
 const OPENROUTER_BASE_URL = 'https://openrouter.ai/api/v1';
 
+/**
+ * Read a positive integer setting, falling back to the default when it is unset or malformed.
+ * These values size module-level limiters, which would throw at import on NaN or 0.
+ */
+function positiveIntFromEnv(name: string, fallback: number): number {
+  const value = parseInt(process.env[name] || '', 10);
+  return Number.isFinite(value) && value >= 1 ? value : fallback;
+}
+
+// OpenRouter has no batch endpoint, so throughput is bounded by running roughly
+// one request per second of the configured per-minute rate limit in parallel
+const OPENROUTER_REQUESTS_PER_MINUTE = positiveIntFromEnv('OPENROUTER_REQUESTS_PER_MINUTE', 120);
+const OPENROUTER_CONCURRENCY = Math.max(1, Math.floor(OPENROUTER_REQUESTS_PER_MINUTE / 60));
+
 // Validate critical configuration
 if (!env.IS_BUILD_TIME && (!OPENROUTER_API_KEY || OPENROUTER_API_KEY.trim() === '')) {
   console.error('⚠️ ERROR: OpenRouter API key is not set in environment variables.');
   console.error('Please set NEXT_SERVER_OPENROUTER_API_KEY in your .env.local file in the project root.');
-  // In development, we'll show a warning but allow the app to start
-  // In production, this would be a critical error
-  if (env.IS_PROD) {
-    throw new Error('OpenRouter API key is not set');
-  }
+  // Not thrown here: chat() and streamChat() reject when the key is missing, so importing
+  // this module never fails
 }
 
 // Firecrawl configuration
 const FIRECRAWL_BASE_URL = process.env.FIRECRAWL_BASE_URL || 'https://api.firecrawl.dev/v1';
 const FIRECRAWL_REQUEST_TIMEOUT = parseInt(process.env.FIRECRAWL_REQUEST_TIMEOUT || '60000'); // 60 seconds
+const FIRECRAWL_CONCURRENCY = positiveIntFromEnv('FIRECRAWL_CONCURRENCY', 2); // Parallel searches across all research runs
+const FIRECRAWL_MAX_SOCKETS = positiveIntFromEnv('FIRECRAWL_MAX_SOCKETS', 16); // Open connections across all requests
 
 // Log configuration for debugging (only in development)
 if (env.IS_DEV) {
@@ -34,16 +48,57 @@ if (env.IS_DEV) {
   console.log('- OpenRouter API Key:', OPENROUTER_API_KEY ? `[Set] (first 5 chars: ${OPENROUTER_API_KEY.substring(0, 5)}...)` : '[Not set]');
   console.log('- Firecrawl API Key:', FIRECRAWL_API_KEY ? '[set]' : '[Not set]');
   console.log('- OpenRouter Model:', OPENROUTER_MODEL);
+  console.log('- OpenRouter Concurrency:', OPENROUTER_CONCURRENCY);
   console.log('- Firecrawl Base URL:', FIRECRAWL_BASE_URL);
   console.log('- Firecrawl Timeout:', FIRECRAWL_REQUEST_TIMEOUT, 'ms');
+  console.log('- Firecrawl Concurrency:', FIRECRAWL_CONCURRENCY);
+  console.log('- Firecrawl Max Sockets:', FIRECRAWL_MAX_SOCKETS);
+}
+
+// Model keys resolved to full OpenRouter IDs; every research step calls chat() with
+// the same few keys, so the registry lookup only needs to happen once per key
+const resolvedModelIds = new Map<string, string>();
+
+/**
+ * Resolve a model key (e.g. 'gemini-flash') to its OpenRouter model ID, memoized per key
+ */
+async function resolveModelId(modelKey: string): Promise<string> {
+  const cached = resolvedModelIds.get(modelKey);
+  if (cached) return cached;
+  
+  try {
+    // Dynamically import to avoid circular dependencies
+    const { modelRegistry } = await import('./models/providers');
+    const modelConfig = modelRegistry.getModelConfig(modelKey);
+    const resolved = modelConfig?.id || modelKey;
+    
+    if (modelConfig && env.IS_DEV) {
+      console.log(`Using: ${modelConfig.name} (${modelConfig.provider})`);
+    }
+    
+    resolvedModelIds.set(modelKey, resolved);
+    return resolved;
+  } catch (error) {
+    // Only log the essential error information; don't cache so the next call retries
+    console.warn('Failed to convert model key to ID');
+    return modelKey;
+  }
 }
 
 // Create a custom OpenRouter client class
 class CustomOpenRouterClient {
   private apiKey: string;
+  // Shared by every chat() and streamChat() call
+  private headers: Record<string, string>;
   
   constructor() {
     this.apiKey = OPENROUTER_API_KEY;
+    this.headers = {
+      'Content-Type': 'application/json',
+      'Authorization': `Bearer ${this.apiKey}`,
+      'HTTP-Referer': 'https://advanced-deep-research.vercel.app/',
+      'X-Title': 'Advanced Deep Research',
+    };
   }
 
   async chat(messages: Array<{ role: string; content: string }>, options: { model?: string } = {}) {
@@ -67,25 +122,9 @@ class CustomOpenRouterClient {
       }
       
       // If the model looks like a model key (not a full ID with provider prefix),
-      // try to get the full ID from the registry
+      // get the full ID from the registry
       if (model && !model.includes('/')) {
-        try {
-          // Dynamically import to avoid circular dependencies
-          const { modelRegistry } = await import('./models/providers');
-          const fullModelId = modelRegistry.getModelId(model);
-          if (fullModelId) {
-            model = fullModelId;
-            
-            // Get the model config for additional info (only needed for specific debug scenarios)
-            const modelConfig = modelRegistry.getModelConfig(model);
-            if (modelConfig && modelConfig.provider && env.IS_DEV) {
-              console.log(`Using: ${modelConfig.name} (${modelConfig.provider})`);
-            }
-          }
-        } catch (error) {
-          // Only log the essential error information
-          console.warn('Failed to convert model key to ID');
-        }
+        model = await resolveModelId(model);
       }
       
       // Only log in development mode
@@ -107,12 +146,7 @@ class CustomOpenRouterClient {
       // New improved response format in OpenRouter
       const response = await fetch('https://openrouter.ai/api/v1/chat/completions', {
         method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-          'Authorization': `Bearer ${this.apiKey}`,
-          'HTTP-Referer': 'https://advanced-deep-research.vercel.app/',
-          'X-Title': 'Advanced Deep Research',
-        },
+        headers: this.headers,
         body: JSON.stringify({
           model: model,
           messages: messages,
@@ -192,18 +226,9 @@ class CustomOpenRouterClient {
       }
       
       // If the model looks like a model key (not a full ID with provider prefix),
-      // try to get the full ID from the registry
+      // get the full ID from the registry
       if (model && !model.includes('/')) {
-        try {
-          // Dynamically import to avoid circular dependencies
-          const { modelRegistry } = await import('./models/providers');
-          const fullModelId = modelRegistry.getModelId(model);
-          if (fullModelId) {
-            model = fullModelId;
-          }
-        } catch (error) {
-          console.warn('Failed to convert model key to ID for streaming');
-        }
+        model = await resolveModelId(model);
       }
       
       // Verify API key is available before making the request
@@ -215,12 +240,7 @@ class CustomOpenRouterClient {
       // Make the streaming request to OpenRouter
       const response = await fetch('https://openrouter.ai/api/v1/chat/completions', {
         method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-          'Authorization': `Bearer ${this.apiKey}`,
-          'HTTP-Referer': 'https://advanced-deep-research.vercel.app/',
-          'X-Title': 'Advanced Deep Research',
-        },
+        headers: this.headers,
         body: JSON.stringify({
           model: model,
           messages: messages,
@@ -239,50 +259,34 @@ class CustomOpenRouterClient {
       
       // Process the stream
       const reader = response.body?.getReader();
-      const decoder = new TextDecoder('utf-8');
       
       if (!reader) {
         throw new Error('Failed to get reader from response');
       }
       
-      // Accumulate partial chunks if necessary
-      let buffer = '';
-      
-      while (true) {
-        const { done, value } = await reader.read();
-        if (done) break;
-        
-        // Decode the chunk
-        const chunk = decoder.decode(value, { stream: true });
-        buffer += chunk;
+      // Process each complete line (SSE format); partial lines are held until the rest arrives
+      for await (const line of readLines(reader)) {
+        // Skip empty lines and keep-alive messages
+        if (!line.trim() || line === ':' || line === 'data: [DONE]') continue;
         
-        // Process each line (SSE format)
-        const lines = buffer.split('\n');
-        buffer = lines.pop() || ''; // Keep the last incomplete line in the buffer
-        
-        for (const line of lines) {
-          // Skip empty lines and keep-alive messages
-          if (!line.trim() || line === ':' || line === 'data: [DONE]') continue;
+        try {
+          // Extract the data part from SSE format
+          const dataMatch = line.match(/^data: (.*)$/);
+          if (!dataMatch) continue;
+          
+          const data = JSON.parse(dataMatch[1]);
+          
+          // Skip incomplete or empty chunks
+          if (!data.choices || !data.choices[0] || !data.choices[0].delta) continue;
           
-          try {
-            // Extract the data part from SSE format
-            const dataMatch = line.match(/^data: (.*)$/);
-            if (!dataMatch) continue;
-            
-            const data = JSON.parse(dataMatch[1]);
-            
-            // Skip incomplete or empty chunks
-            if (!data.choices || !data.choices[0] || !data.choices[0].delta) continue;
-            
-            // Extract content delta
-            const contentDelta = data.choices[0].delta.content;
-            if (contentDelta) {
-              yield contentDelta;
-            }
-          } catch (error) {
-            console.error('Error parsing streaming response chunk:', error);
-            // Continue to next line
+          // Extract content delta
+          const contentDelta = data.choices[0].delta.content;
+          if (contentDelta) {
+            yield contentDelta;
           }
+        } catch (error) {
+          console.error('Error parsing streaming response chunk:', error);
+          // Continue to next line
         }
       }
     } catch (error) {
@@ -295,6 +299,9 @@ class CustomOpenRouterClient {
 // Export a single instance of the client
 export const openRouterClient = new CustomOpenRouterClient();
 
+// Maximum parallel OpenRouter requests derived from the rate limit
+export const openRouterConcurrency = OPENROUTER_CONCURRENCY;
+
 // Create an adapter that's compatible with the LangChain pipe() method
 export const openRouterAdapter = {
   model: OPENROUTER_MODEL,
@@ -382,6 +389,7 @@ Always cite your sources throughout the text using [Source: URL] format.`
 export const firecrawlApiKey = FIRECRAWL_API_KEY;
 export const firecrawlBaseUrl = FIRECRAWL_BASE_URL;
 export const firecrawlRequestTimeout = FIRECRAWL_REQUEST_TIMEOUT;
+export const firecrawlConcurrency = FIRECRAWL_CONCURRENCY;
 
 // Validate Firecrawl configuration
 if (!firecrawlApiKey || firecrawlApiKey.trim() === '') {
@@ -400,13 +408,25 @@ export const firecrawlHeaders = {
   'Content-Type': 'application/json'
 };
 
+// Shared Firecrawl HTTP client: keep-alive agents reuse TLS connections between searches,
+// and maxSockets caps open connections across every research run in this process
+export const firecrawlHttp = axios.create({
+  baseURL: firecrawlBaseUrl,
+  timeout: firecrawlRequestTimeout,
+  headers: firecrawlHeaders,
+  httpAgent: new http.Agent({ keepAlive: true, maxSockets: FIRECRAWL_MAX_SOCKETS }),
+  httpsAgent: new https.Agent({ keepAlive: true, maxSockets: FIRECRAWL_MAX_SOCKETS })
+});
+
 // Export common Firecrawl options
 export const defaultFirecrawlOptions = {
   limit: 10,
   country: 'us',
   lang: 'en',
   scrapeOptions: {
-    formats: ['markdown', 'links'],
+    // Only markdown is read downstream; requesting every outbound link of each page
+    // made responses much larger for nothing
+    formats: ['markdown'],
     onlyMainContent: true
   }
 };
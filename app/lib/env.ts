@@ -147,6 +147,10 @@ function getApiKey(key: string, fallback: string = ''): string {
   return value;
 }
 
+// Set once validation passes; the variables can't change without a restart, so later
+// per-request checks skip re-reading them
+let envValidated = false;
+
 /**
  * Environment object with typed access to environment variables and default values
  */
@@ -178,7 +182,7 @@ export const env = {
   IS_BROWSER,
   
   // Check if we're missing any required variables (for conditional logic)
-  IS_VALID: () => validateEnv().valid
+  IS_VALID: () => envValidated || (envValidated = validateEnv().valid)
 };
 
 // Debug output in development mode on server
@@ -200,11 +204,8 @@ if (IS_BUILD_TIME) {
 } else {
   const envStatus = validateEnv();
   if (!envStatus.valid) {
+    // Log only: the API routes check env.IS_VALID() per request and answer with a clear
+    // error (503 from /api/env), which a throw here would replace with a failed module import
     console.error(`⚠️ Missing required environment variables: ${envStatus.missing.join(', ')}`);
-    
-    // Only throw in production server-side runtime, never during build or in browser
-    if (process.env.NODE_ENV === 'production' && !IS_BUILD_TIME && !IS_BROWSER) {
-      throw new Error(`Missing required environment variables: ${envStatus.missing.join(', ')}`);
-    }
   }
 } 
\ No newline at end of file
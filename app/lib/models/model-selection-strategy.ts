@@ -38,6 +38,9 @@ export interface ModelSelectionStrategy {
  * Default implementation of model selection strategy
  */
 export class DefaultModelSelectionStrategy implements ModelSelectionStrategy {
+  private cachedQuery = '';
+  private cachedTermPatterns: RegExp[] = [];
+  
   /**
    * Select appropriate model based on content type and relevance
    */
@@ -121,23 +124,36 @@ export class DefaultModelSelectionStrategy implements ModelSelectionStrategy {
     return 'general';
   }
   
+  /**
+   * Get the word-boundary patterns for a query's significant terms. Relevance is usually scored
+   * for many pieces of content against the same query in a row, so the last query's patterns are kept.
+   */
+  private getQueryTermPatterns(query: string): RegExp[] {
+    if (query !== this.cachedQuery) {
+      this.cachedQuery = query;
+      this.cachedTermPatterns = query.toLowerCase().split(/\s+/)
+        .filter(term => term.length > 3) // Filter out short words
+        .map(term => term.replace(/[.,;:?!]/g, '')) // Remove punctuation
+        .map(term => term.replace(/[\\^$*+?()[\]{}|]/g, '\\$&')) // Escape regex metacharacters (e.g. "c++")
+        .map(term => new RegExp(`\\b${term}\\b`, 'gi'));
+    }
+    return this.cachedTermPatterns;
+  }
+  
   /**
    * Estimate the relevance of content to a query
    */
   estimateRelevance(content: string, query: string): number {
     if (!content || !query) return 0;
     
-    // Normalize content and query
+    // Normalize content; query terms are compiled once per query
     const normalizedContent = content.toLowerCase();
-    const queryTerms = query.toLowerCase().split(/\s+/)
-      .filter(term => term.length > 3) // Filter out short words
-      .map(term => term.replace(/[.,;:?!]/g, '')); // Remove punctuation
+    const termPatterns = this.getQueryTermPatterns(query);
     
-    if (queryTerms.length === 0) return 0.5; // Default if no substantial query terms
+    if (termPatterns.length === 0) return 0.5; // Default if no substantial query terms
     
     // Count occurrences of query terms in content
-    const termMatches = queryTerms.map(term => {
-      const regex = new RegExp(`\\b${term}\\b`, 'gi');
+    const termMatches = termPatterns.map(regex => {
       const matches = normalizedContent.match(regex);
       return matches ? matches.length : 0;
     });
@@ -148,7 +164,7 @@ export class DefaultModelSelectionStrategy implements ModelSelectionStrategy {
     
     // Calculate percentage of query terms found
     const termsFound = termMatches.filter(count => count > 0).length;
-    const termCoverage = termsFound / queryTerms.length;
+    const termCoverage = termsFound / termPatterns.length;
     
     // Combine factors for final relevance score (0-1)
     const relevance = Math.min(1, (matchRatio * 0.5) + (termCoverage * 0.5));
@@ -51,21 +51,34 @@ export abstract class BaseModelProvider {
   // Main method to be implemented by all providers
   abstract chat(messages: ChatMessage[]): Promise<ModelResponse>;
 
-  // Streaming chat completion (to be implemented by subclasses)
+  // Streaming chat completion as an async generator of content chunks (to be implemented by subclasses);
+  // the generator's return value is the complete response
+  async *streamChatChunks(messages: ChatMessage[]): AsyncGenerator<string, ModelResponse> {
+    // Default implementation that falls back to regular chat
+    console.warn('streamChatChunks not implemented in this provider, falling back to regular chat');
+    const response = await this.chat(messages);
+    
+    // Emit the entire response as one chunk
+    yield response.content;
+    
+    return response;
+  }
+
+  // Callback-style streaming chat completion, built on streamChatChunks
   async streamChat(
     messages: ChatMessage[],
     callback: StreamChunkCallback
   ): Promise<ModelResponse> {
-    // Default implementation that falls back to regular chat
-    console.warn('streamChat not implemented in this provider, falling back to regular chat');
-    const response = await this.chat(messages);
-    
-    // Process the entire response as one chunk through the callback
-    if (callback) {
-      callback(response.content);
+    const stream = this.streamChatChunks(messages);
+    let step = await stream.next();
+    while (!step.done) {
+      if (callback) {
+        callback(step.value);
+      }
+      step = await stream.next();
     }
     
-    return response;
+    return step.value;
   }
 
   // Helper for wrapping in LangChain compatible format
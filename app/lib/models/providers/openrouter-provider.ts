@@ -1,5 +1,6 @@
-import { BaseModelProvider, ChatMessage, ModelProviderOptions, ModelResponse, StreamChunkCallback } from './base-provider';
+import { BaseModelProvider, ChatMessage, ModelProviderOptions, ModelResponse } from './base-provider';
 import { env } from '../../env';
+import { readLines } from '../../utils/streams';
 
 // Extended options for OpenRouter
 export interface OpenRouterOptions extends ModelProviderOptions {
@@ -22,6 +23,8 @@ export class OpenRouterProvider extends BaseModelProvider {
   private appName: string;
   private appUrl: string;
   private providerRouting?: OpenRouterOptions['providerRouting'];
+  // Built once per provider; the registry caches providers, so every request reuses it
+  private headers: Record<string, string>;
   
   constructor(options: OpenRouterOptions) {
     super(options);
@@ -32,6 +35,12 @@ export class OpenRouterProvider extends BaseModelProvider {
     this.appName = options.appName || env.APP_NAME || 'Advanced Research App';
     this.appUrl = options.appUrl || env.APP_URL || 'https://example.com';
     this.providerRouting = options.providerRouting;
+    this.headers = {
+      'Content-Type': 'application/json',
+      'Authorization': `Bearer ${this.apiKey}`,
+      'HTTP-Referer': this.appUrl,
+      'X-Title': this.appName
+    };
     
     if (!env.IS_BUILD_TIME && !this.apiKey) {
       console.warn('WARNING: OpenRouter API key not found. Set NEXT_SERVER_OPENROUTER_API_KEY in your .env.local file.');
@@ -52,12 +61,7 @@ export class OpenRouterProvider extends BaseModelProvider {
       try {
         const response = await fetch(`${this.baseUrl}/chat/completions`, {
           method: 'POST',
-          headers: {
-            'Content-Type': 'application/json',
-            'Authorization': `Bearer ${this.apiKey}`,
-            'HTTP-Referer': this.appUrl,
-            'X-Title': this.appName
-          },
+          headers: this.headers,
           body: JSON.stringify({
             model: this.options.modelId,
             messages: messages.map(m => ({
@@ -113,7 +117,7 @@ export class OpenRouterProvider extends BaseModelProvider {
     }
   }
 
-  async streamChat(messages: ChatMessage[], callback: StreamChunkCallback): Promise<ModelResponse> {
+  async *streamChatChunks(messages: ChatMessage[]): AsyncGenerator<string, ModelResponse> {
     try {
       if (!this.apiKey || this.apiKey.trim() === '') {
         console.error('ERROR: No OpenRouter API key found.');
@@ -127,12 +131,7 @@ export class OpenRouterProvider extends BaseModelProvider {
       try {
         const response = await fetch(`${this.baseUrl}/chat/completions`, {
           method: 'POST',
-          headers: {
-            'Content-Type': 'application/json',
-            'Authorization': `Bearer ${this.apiKey}`,
-            'HTTP-Referer': this.appUrl,
-            'X-Title': this.appName
-          },
+          headers: this.headers,
           body: JSON.stringify({
             model: this.options.modelId,
             messages: messages.map(m => ({
@@ -158,8 +157,8 @@ export class OpenRouterProvider extends BaseModelProvider {
 
         // Process the streaming response
         const reader = response.body?.getReader();
-        const decoder = new TextDecoder();
-        let fullContent = '';
+        // Collect chunks and join once at the end instead of re-concatenating per token
+        const contentParts: string[] = [];
         let model = '';
         let usage = { prompt_tokens: 0, completion_tokens: 0, total_tokens: 0 };
         
@@ -167,61 +166,48 @@ export class OpenRouterProvider extends BaseModelProvider {
           throw new Error('Failed to get reader from stream');
         }
         
-        // Read the stream data
-        while (true) {
-          const { done, value } = await reader.read();
-          if (done) break;
+        // Read the stream one complete SSE line at a time; an event can be split across reads
+        for await (const line of readLines(reader)) {
+          // Skip non-data lines
+          if (!line.startsWith('data: ')) continue;
           
-          // Decode the chunk value
-          const chunk = decoder.decode(value, { stream: true });
+          // Extract the data portion
+          const data = line.substring(6);
           
-          // Process each SSE line
-          const lines = chunk.split('\n').filter(line => line.trim() !== '');
+          // Handle end of stream marker
+          if (data === '[DONE]') continue;
           
-          for (const line of lines) {
-            // Skip non-data lines
-            if (!line.startsWith('data: ')) continue;
-            
-            // Extract the data portion
-            const data = line.substring(6);
-            
-            // Handle end of stream marker
-            if (data === '[DONE]') continue;
+          try {
+            // Parse JSON data
+            const parsedData = JSON.parse(data);
             
-            try {
-              // Parse JSON data
-              const parsedData = JSON.parse(data);
+            // Extract the delta content if available
+            if (parsedData.choices && parsedData.choices[0]?.delta?.content) {
+              const contentChunk = parsedData.choices[0].delta.content;
+              contentParts.push(contentChunk);
               
-              // Extract the delta content if available
-              if (parsedData.choices && parsedData.choices[0]?.delta?.content) {
-                const contentChunk = parsedData.choices[0].delta.content;
-                fullContent += contentChunk;
-                
-                // Update model info if available
-                if (parsedData.model && !model) {
-                  model = parsedData.model;
-                }
-                
-                // Update usage info if available
-                if (parsedData.usage) {
-                  usage = parsedData.usage;
-                }
-                
-                // Invoke the callback with the content chunk
-                if (callback) {
-                  callback(contentChunk);
-                }
+              // Update model info if available
+              if (parsedData.model && !model) {
+                model = parsedData.model;
               }
-            } catch (parseError) {
-              console.error('Error parsing streaming data:', parseError);
-              continue; // Continue processing other chunks
+              
+              // Update usage info if available
+              if (parsedData.usage) {
+                usage = parsedData.usage;
+              }
+              
+              // Hand the content chunk to the consumer as soon as it arrives
+              yield contentChunk;
             }
+          } catch (parseError) {
+            console.error('Error parsing streaming data:', parseError);
+            continue; // Continue processing other chunks
           }
         }
         
         // Return the final response
         return {
-          content: fullContent,
+          content: contentParts.join(''),
           metadata: {
             model: model || this.options.modelId,
             usage,
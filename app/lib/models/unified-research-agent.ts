@@ -1,7 +1,11 @@
-import { openRouterClient, firecrawlApiKey, firecrawlBaseUrl, firecrawlRequestTimeout, firecrawlHeaders, defaultFirecrawlOptions } from '../clients';
+import { openRouterClient, firecrawlApiKey, firecrawlHttp, firecrawlRequestTimeout, firecrawlConcurrency, defaultFirecrawlOptions, openRouterConcurrency } from '../clients';
 import pLimit from 'p-limit';
-import { modelRegistry } from './providers';
 import axios from 'axios';
+import { modelRegistry, ChatMessage } from './providers';
+import { chunkArray, CompletionQueue } from '../utils/batch-processing';
+import { TtlCache } from '../utils/cache';
+import { dedupeByUrl, dedupeSearchResults } from '../utils/urls';
+import { createModelSelectionStrategy } from './model-selection-strategy';
 
 // Add a utility function for structured logging
 /**
@@ -15,11 +19,13 @@ class AgentLogger {
   }
   
   /**
-   * Log an informational message with optional data
+   * Log an informational message with optional data. Pass a function to build the data
+   * lazily, so hot paths don't assemble log payloads when logging is disabled
    */
-  info(message: string, data?: any): void {
+  info(message: string, data?: any | (() => any)): void {
     if (!this.enabled) return;
     
+    if (typeof data === 'function') data = data();
     const timestamp = new Date().toISOString().substring(11, 19);
     if (data) {
       console.log(`[${timestamp}] 🔍 [Research] ${message}`, data);
@@ -29,11 +35,12 @@ class AgentLogger {
   }
   
   /**
-   * Log a warning with optional data
+   * Log a warning with optional data, built lazily when given as a function
    */
-  warn(message: string, data?: any): void {
+  warn(message: string, data?: any | (() => any)): void {
     if (!this.enabled) return;
     
+    if (typeof data === 'function') data = data();
     const timestamp = new Date().toISOString().substring(11, 19);
     if (data) {
       console.warn(`[${timestamp}] ⚠️ [Research] ${message}`, data);
@@ -77,9 +84,18 @@ export interface Source {
   url: string;
   relevance: number;
   domain?: string;
+  snippet?: string;
   favicon?: string;
 }
 
+// A search result reduced to the fields the agent reads
+export interface SearchResult {
+  title: string;
+  url: string;
+  description: string;
+  markdown: string;
+}
+
 export interface ResearchResult {
   research: string;
   analysis: string;
@@ -98,8 +114,203 @@ const DEFAULT_SYSTEM_PROMPT = `You are an expert researcher. You answer question
 - Cite relevant sources whenever possible with links
 - Maintain academic rigor and objectivity`;
 
-// Increase this if you have higher API rate limits
-const CONCURRENCY_LIMIT = 2;
+// Built once so every call sends a byte-identical system prefix, which lets
+// OpenRouter/Anthropic prompt caching reuse it across requests
+const SYSTEM_MESSAGE: ChatMessage = { role: 'system', content: DEFAULT_SYSTEM_PROMPT };
+
+// Claude gets a shorter system prompt focused on inline citations
+const CLAUDE_SYSTEM_PROMPT = `You are a helpful research assistant that provides accurate, insightful answers based on search results.
+Use clear formatting with appropriate headers, lists, and emphasis. Be accurate, comprehensive, and concise.
+Always cite your sources inline in the format [Source X], where X is the numerical index of the source.`;
+
+// One LLM limiter for the whole process, shared by deep research, regular research and the
+// final report, so concurrent research runs can't multiply past the plan's rate limit; set
+// OPENROUTER_REQUESTS_PER_MINUTE if you have higher API rate limits
+const openRouterLimit = pLimit(openRouterConcurrency);
+
+// Maximum sub-questions whose search queries are generated in a single LLM call
+const MAX_QUESTIONS_PER_QUERY_BATCH = 10;
+
+// Character budget for prior learnings sent to query planning; only the newest learnings are
+// kept, so planner prompts stop growing with every level of a deep research run
+const MAX_PLANNER_LEARNINGS_CHARS = 8000;
+
+// Thresholds for accepting a streamed answer as the final report without another LLM pass
+const MIN_REPORT_CHARS = 1500;
+const MIN_REPORT_HEADINGS = 2;
+const MIN_REPORT_CITATIONS = 2;
+const REPORT_HEADING_PATTERN = /^#{1,3}\s+\S/gm;
+const REPORT_CITATION_PATTERN = /\[Source \d+\]|https?:\/\/\S+/g;
+
+// Model replies often wrap their JSON in a markdown code block; otherwise the outermost object
+// containing the expected key is taken
+const JSON_CODE_BLOCK_PATTERN = /```(?:json)?\s*({[\s\S]*?})\s*```/;
+const QUERIES_JSON_PATTERN = /{[\s\S]*"queries"[\s\S]*}/;
+const QUERY_BATCH_JSON_PATTERN = /{[\s\S]*"results"[\s\S]*}/;
+const LEARNINGS_JSON_PATTERN = /{[\s\S]*"learnings"[\s\S]*}/;
+
+// Character budget for search results in a single prompt (~15k tokens at 4 chars per token);
+// past this, the least relevant pages are dropped rather than sending full markdown for all of them
+const MAX_SEARCH_RESULT_CHARS = 60000;
+// Per-page cap applied before formatting, so one huge page can't crowd out the rest of the budget
+const MAX_CHARS_PER_RESULT = MAX_SEARCH_RESULT_CHARS / 4;
+const relevanceStrategy = createModelSelectionStrategy();
+
+// Search results are shared across sub-questions and requests, since generated
+// queries frequently overlap (e.g. background facts about the topic). Scraped entries hold full
+// page markdown, so the number kept is capped as well as their age
+const SEARCH_CACHE_TTL_MS = 10 * 60 * 1000;
+const SEARCH_CACHE_MAX_ENTRIES = 128;
+const searchCache = new TtlCache<{ results: SearchResult[]; sources: Source[] }>(SEARCH_CACHE_TTL_MS, SEARCH_CACHE_MAX_ENTRIES);
+
+// Learnings extracted from a query's search results, keyed by planner model, query and result
+// URLs, so re-running a failed or abandoned research run only redoes the stages that didn't finish
+// Entries are only a few short strings, so many more are kept than for search results
+const LEARNINGS_CACHE_MAX_ENTRIES = 512;
+const learningsCache = new TtlCache<{
+  learnings: string[];
+  followUpQuestions: Array<{query: string; goal: string}>;
+}>(SEARCH_CACHE_TTL_MS, LEARNINGS_CACHE_MAX_ENTRIES);
+
+// Search queries planned for a single question, keyed by planner model, question and the
+// learnings it was planned with. Only the first level of a deep research run is planned alone
+// and without learnings, so a re-run reuses that plan; deeper levels are planned in batches
+// with learnings that depend on completion order, and are always planned afresh
+const queryPlanCache = new TtlCache<Array<{query: string; researchGoal: string}>>(SEARCH_CACHE_TTL_MS, LEARNINGS_CACHE_MAX_ENTRIES);
+
+// A search shared by every agent that asked for the same query while it was running
+interface InFlightSearch {
+  promise: Promise<{ results: SearchResult[]; sources: Source[] }>;
+  // Cancels the request; only fired once every agent waiting on it has been aborted
+  controller: AbortController;
+  waiters: number;
+}
+
+// Searches currently running, by cache key, so concurrent callers share one request
+const inFlightSearches = new Map<string, InFlightSearch>();
+
+// One Firecrawl limiter for the whole process, so concurrent research runs can't
+// multiply past the plan's rate limit
+const firecrawlLimit = pLimit(firecrawlConcurrency);
+
+// Retries for rate-limited (429) or transiently failing Firecrawl searches
+const FIRECRAWL_MAX_RETRIES = 3;
+const FIRECRAWL_RETRY_BASE_MS = 1000;
+
+/**
+ * Whether a failed Firecrawl request is worth retrying: rate limits, server errors and
+ * dropped connections, but not client errors, timeouts or deliberate aborts
+ */
+function isRetryableSearchError(error: unknown): boolean {
+  if (!axios.isAxiosError(error) || axios.isCancel(error) || error.code === 'ECONNABORTED') {
+    return false;
+  }
+  const status = error.response?.status;
+  return status === undefined || status === 429 || status >= 500;
+}
+
+/**
+ * Iterate a streamed LLM response, holding a slot in the OpenRouter limiter only until its
+ * first chunk arrives: the request counts against the rate limit, but reading the rest of a
+ * long answer shouldn't keep every other LLM call waiting
+ */
+async function* limitStreamStart<T>(stream: AsyncIterable<T>): AsyncGenerator<T> {
+  const iterator = stream[Symbol.asyncIterator]();
+  try {
+    let next = await openRouterLimit(() => iterator.next());
+    while (!next.done) {
+      yield next.value;
+      next = await iterator.next();
+    }
+  } finally {
+    // Close the underlying stream if the caller stops reading early
+    await iterator.return?.();
+  }
+}
+
+/**
+ * Keep only the fields the agent reads from a raw Firecrawl result, so cached results
+ * don't hold on to each page's full metadata object
+ */
+function toSearchResult(raw: any): SearchResult {
+  return {
+    title: raw.title || raw.metadata?.title || 'Untitled',
+    url: raw.url || raw.metadata?.sourceURL || '',
+    description: raw.description || raw.snippet || '',
+    markdown: raw.markdown || ''
+  };
+}
+
+/**
+ * Wait for a delay, rejecting as soon as the signal aborts so the caller can give up early
+ */
+function sleep(ms: number, signal: AbortSignal): Promise<void> {
+  return new Promise((resolve, reject) => {
+    if (signal.aborted) return reject(new Error('Aborted'));
+    const onAbort = () => {
+      clearTimeout(timer);
+      reject(new Error('Aborted'));
+    };
+    const timer = setTimeout(() => {
+      signal.removeEventListener('abort', onAbort);
+      resolve();
+    }, ms);
+    signal.addEventListener('abort', onAbort, { once: true });
+  });
+}
+
+/**
+ * Extract the JSON text from a model reply, falling back to the whole reply if no object is found
+ */
+function extractJson(reply: string, objectPattern: RegExp): string {
+  const jsonMatch = reply.match(JSON_CODE_BLOCK_PATTERN) || reply.match(objectPattern);
+  return jsonMatch ? jsonMatch[1] || jsonMatch[0] : reply;
+}
+
+/**
+ * The most recent learnings that fit within a character budget, in their original order
+ */
+function recentLearnings(learnings: string[], maxChars: number): string[] {
+  let start = learnings.length;
+  let usedChars = 0;
+  while (start > 0 && usedChars + learnings[start - 1].length + 1 <= maxChars) {
+    usedChars += learnings[start - 1].length + 1;
+    start--;
+  }
+  return learnings.slice(start);
+}
+
+// Words that only pad the start of a query ("what is the ...") without changing what a web
+// search returns; question words like "why" and "how" change the answer, so they are kept
+const LEADING_QUERY_FILLER = new Set(['what', 'is', 'are', 'the', 'a', 'an']);
+
+// Sentence punctuation at the end of a query, which search engines ignore
+const TRAILING_QUERY_PUNCTUATION = /[\s.?!]+$/;
+
+/**
+ * Lowercase and collapse whitespace, so text that differs only in case or spacing compares equal
+ */
+function normalizeText(text: string): string {
+  return text.trim().toLowerCase().replace(/\s+/g, ' ');
+}
+
+/**
+ * Normalize a search query so trivially different phrasings share a cache entry. Case,
+ * spacing, trailing sentence punctuation and leading filler words are ignored ("What is the
+ * Rust borrow checker?" and "rust borrow checker" match). Everything else is kept: word order
+ * ("flights london to paris" vs "flights paris to london") and search operators such as quoted
+ * phrases and site: filters change the results, so those queries stay distinct. Queries made
+ * up entirely of filler words fall back to their whitespace-normalized text.
+ */
+function normalizeQuery(query: string): string {
+  const text = normalizeText(query);
+  const words = text.replace(TRAILING_QUERY_PUNCTUATION, '').split(' ').filter(word => word);
+
+  let start = 0;
+  while (start < words.length && LEADING_QUERY_FILLER.has(words[start])) start++;
+
+  return start < words.length ? words.slice(start).join(' ') : text;
+}
 
 /**
  * Unified Research Agent that can handle both regular and deep research modes
@@ -108,15 +319,21 @@ export class UnifiedResearchAgent {
   private progressCallback?: (progress: ResearchProgress) => void;
   private abortController: AbortController;
   private modelKey: string;
+  // Model for query generation and learning extraction, which only emit small JSON payloads.
+  // It is the selected model unless PLANNER_MODEL_KEY opts into a separate (e.g. faster) one,
+  // so a user who picked a free model isn't silently billed for another
+  private plannerModelKey: string;
 
   constructor(config: { 
     progressCallback?: (progress: ResearchProgress) => void;
     modelKey?: string;
+    plannerModelKey?: string;
   } = {}) {
     this.progressCallback = config.progressCallback;
     this.abortController = new AbortController();
     this.modelKey = config.modelKey || process.env.DEFAULT_MODEL_KEY || 'deepseek-r1';
-    logger.info(`Agent initialized with model: ${this.modelKey}`);
+    this.plannerModelKey = config.plannerModelKey || process.env.PLANNER_MODEL_KEY || this.modelKey;
+    logger.info(`Agent initialized with model: ${this.modelKey} (planner: ${this.plannerModelKey})`);
   }
 
   /**
@@ -140,59 +357,127 @@ export class UnifiedResearchAgent {
    */
   private trimPrompt(text: string, maxChars = 4000): string {
     if (!text) return '';
-    return text.length > maxChars ? text.substring(0, maxChars) + '...' : text;
+    if (text.length <= maxChars) return text;
+    // Don't cut a surrogate pair in half, which would leave a broken character in the prompt
+    const lastCode = text.charCodeAt(maxChars - 1);
+    const end = lastCode >= 0xd800 && lastCode <= 0xdbff ? maxChars - 1 : maxChars;
+    return text.substring(0, end) + '...';
   }
 
   /**
-   * Search the web using Firecrawl API
+   * Search the web using Firecrawl API. Page markdown is only scraped when `scrape` is set;
+   * otherwise results carry just their title, URL and description
    */
-  private async searchWeb(query: string): Promise<{ results: any[]; sources: Source[] }> {
+  private async searchWeb(
+    query: string,
+    options: { scrape?: boolean } = {}
+  ): Promise<{ results: SearchResult[]; sources: Source[] }> {
+    const signal = this.abortController.signal;
+    if (signal.aborted) return { results: [], sources: [] };
+
+    const scrape = options.scrape ?? false;
+    // Scraped and description-only results differ, so they are cached and shared separately
+    const cacheKey = `${scrape ? 'scrape' : 'search'}:${normalizeQuery(query)}`;
+    const cached = searchCache.get(cacheKey);
+    if (cached) {
+      logger.info(`Using cached search results for: "${query.substring(0, 50)}${query.length > 50 ? '...' : ''}"`);
+      return cached;
+    }
+    
+    // Sub-questions (and concurrent requests) often generate the same query; wait on the
+    // request that is already running instead of sending a duplicate
+    let search = inFlightSearches.get(cacheKey);
+    if (search) {
+      logger.info(`Joining in-flight search for: "${query.substring(0, 50)}${query.length > 50 ? '...' : ''}"`);
+    } else {
+      const controller = new AbortController();
+      const started: InFlightSearch = {
+        promise: this.fetchSearchResults(query, scrape, cacheKey, controller.signal),
+        controller,
+        waiters: 0
+      };
+      started.promise.finally(() => {
+        if (inFlightSearches.get(cacheKey) === started) inFlightSearches.delete(cacheKey);
+      });
+      inFlightSearches.set(cacheKey, started);
+      search = started;
+    }
+    
+    // The shared request belongs to every waiter, so one client disconnecting only cancels
+    // it when nobody else is still waiting on it
+    const shared = search;
+    shared.waiters++;
+    const onAbort = () => {
+      if (--shared.waiters > 0) return;
+      shared.controller.abort();
+      if (inFlightSearches.get(cacheKey) === shared) inFlightSearches.delete(cacheKey);
+    };
+    signal.addEventListener('abort', onAbort, { once: true });
+    
+    try {
+      const result = await shared.promise;
+      // A cancelled search returns no results; if this agent is still running, search again
+      if (shared.controller.signal.aborted && !signal.aborted) {
+        return this.searchWeb(query, options);
+      }
+      return result;
+    } finally {
+      signal.removeEventListener('abort', onAbort);
+    }
+  }
+
+  /**
+   * Run a Firecrawl search, caching non-empty results under the given key
+   */
+  private async fetchSearchResults(
+    query: string,
+    scrape: boolean,
+    cacheKey: string,
+    signal: AbortSignal
+  ): Promise<{ results: SearchResult[]; sources: Source[] }> {
     try {
       logger.info(`Searching web for: "${query.substring(0, 50)}${query.length > 50 ? '...' : ''}"`);
       
-      // Construct the search endpoint
-      const endpoint = `${firecrawlBaseUrl}/search`;
-      
-      // Format request according to Firecrawl API
+      // Format request according to Firecrawl API; without scrapeOptions Firecrawl only
+      // returns search metadata, which is much smaller and faster than full pages
+      const { scrapeOptions, ...searchOptions } = defaultFirecrawlOptions;
       const requestPayload = {
         query,
-        ...defaultFirecrawlOptions,
+        ...searchOptions,
+        ...(scrape ? { scrapeOptions } : {}),
         timeout: Math.floor(firecrawlRequestTimeout * 0.75) // 75% of the total timeout
       };
 
-      const response = await axios.post(
-        endpoint, 
-        requestPayload,
-        {
-          headers: firecrawlHeaders,
-          timeout: firecrawlRequestTimeout,
-          signal: this.abortController.signal
-        }
-      );
+      const response = await firecrawlLimit(() => this.postSearchWithRetry(requestPayload, signal));
       
       if (
         response.data && 
         response.data.data && 
         Array.isArray(response.data.data)
       ) {
-        const results = response.data.data;
+        // Drop repeated pages (same canonical URL or same content) before they reach a prompt
+        const results = dedupeSearchResults(response.data.data.map(toSearchResult));
         
-        // Extract sources from results
+        // Extract sources from results; relevance follows Firecrawl's ranking, 1 for the top result
         const sources: Source[] = results
-          .map((result: any) => ({
-            title: result.title || 'Untitled',
-            url: result.url || '',
-            snippet: result.snippet || result.description || ''
-          }))
-          .filter((source: Source) => source.url); // Filter out entries without URLs
+          .filter(result => result.url) // Filter out entries without URLs
+          .map((result, index, ranked) => ({
+            title: result.title,
+            url: result.url,
+            relevance: 1 - index / ranked.length,
+            snippet: result.description
+          }));
         
         if (results.length === 0) {
           logger.warn(`No results found for query: "${query.substring(0, 30)}..."`);
         } else {
-          logger.info(`Found ${results.length} results for web search`, {
+          logger.info(`Found ${results.length} results for web search`, () => ({
             query: query.substring(0, 30),
             sourceCount: sources.length
-          });
+          }));
+          
+          // Only cache successful searches so transient failures are retried
+          searchCache.set(cacheKey, { results, sources });
         }
         
         return { results, sources };
@@ -201,23 +486,56 @@ export class UnifiedResearchAgent {
         return { results: [], sources: [] };
       }
     } catch (error) {
-      logger.error('Error searching web:', error);
+      // Cancellation isn't a failure; every agent waiting on this search has gone away
+      if (!signal.aborted) {
+        logger.error('Error searching web:', error);
+      }
       return { results: [], sources: [] };
     }
   }
 
+  /**
+   * POST a search to Firecrawl, retrying rate limits and transient failures with jittered backoff.
+   * Aborting the signal cancels the request and any pending retry wait, freeing the limiter slot.
+   */
+  private async postSearchWithRetry(payload: object, signal: AbortSignal) {
+    for (let attempt = 0; ; attempt++) {
+      try {
+        // Base URL, headers and timeout come from the shared client
+        return await firecrawlHttp.post('/search', payload, { signal });
+      } catch (error) {
+        if (attempt >= FIRECRAWL_MAX_RETRIES || !isRetryableSearchError(error)) {
+          throw error;
+        }
+        
+        // Exponential backoff with jitter so parallel searches don't retry in lockstep
+        const delay = FIRECRAWL_RETRY_BASE_MS * 2 ** attempt + Math.random() * FIRECRAWL_RETRY_BASE_MS;
+        logger.warn(`Firecrawl search failed (attempt ${attempt + 1}/${FIRECRAWL_MAX_RETRIES + 1}), retrying in ${Math.round(delay)}ms`);
+        await sleep(delay, signal);
+      }
+    }
+  }
+
   /**
    * Generate search queries based on the user query and previous learnings
    */
   private async generateSerpQueries(query: string, numQueries = 3, learnings?: string[]): Promise<Array<{query: string; researchGoal: string}>> {
+    // The plan follows the exact question, so only case and whitespace are normalized here
+    const cacheKey = [
+      this.plannerModelKey,
+      numQueries,
+      normalizeText(query),
+      ...(learnings || [])
+    ].join('\n');
+    const cached = queryPlanCache.get(cacheKey);
+    if (cached) {
+      logger.info(`Using cached search queries for: "${query.substring(0, 40)}..."`);
+      return cached;
+    }
+
     try {
       logger.info(`Generating search queries for: "${query.substring(0, 40)}..."`);
       
-      const systemMessage = {
-        role: 'system',
-        content: DEFAULT_SYSTEM_PROMPT
-      };
-
       const userPrompt = `Given the following prompt from the user, generate a list of SERP queries to research the topic. Return a maximum of ${numQueries} queries, but feel free to return less if the original prompt is clear. Make sure each query is unique and not similar to each other: 
       
 USER QUERY: ${query}
@@ -239,27 +557,24 @@ Return your response as a valid JSON object with this structure:
 }`;
 
       const messages = [
-        systemMessage,
+        SYSTEM_MESSAGE,
         { role: 'user', content: userPrompt }
       ];
 
-      // Call the OpenRouter API with the selected model
-      const result = await openRouterClient.chat(messages, { model: this.modelKey });
+      // Call the OpenRouter API with the planner model
+      const result = await openRouterClient.chat(messages, { model: this.plannerModelKey });
       
       // Parse the result to extract the queries
       try {
-        // Find JSON object in the response (it might be wrapped in markdown code blocks)
-        const jsonMatch = result.match(/```(?:json)?\s*({[\s\S]*?})\s*```/) || 
-                        result.match(/{[\s\S]*"queries"[\s\S]*}/);
-        
-        const jsonStr = jsonMatch ? jsonMatch[1] || jsonMatch[0] : result;
-        const parsed = JSON.parse(jsonStr);
+        const parsed = JSON.parse(extractJson(result, QUERIES_JSON_PATTERN));
         
         if (parsed && Array.isArray(parsed.queries)) {
           const queries = parsed.queries.slice(0, numQueries);
-          logger.info(`Generated ${queries.length} search queries`, {
+          logger.info(`Generated ${queries.length} search queries`, () => ({
             queries: queries.map((q: { query: string }) => q.query)
-          });
+          }));
+          // Fallbacks below aren't cached, so a failed call is retried next time
+          queryPlanCache.set(cacheKey, queries);
           return queries;
         } else {
           throw new Error('Invalid response format - no queries array found');
@@ -285,12 +600,94 @@ Return your response as a valid JSON object with this structure:
     }
   }
 
+  /**
+   * Generate search queries for several sub-questions with a single LLM call.
+   * Results are returned in the same order as the input questions; any question
+   * the model skips falls back to being searched directly.
+   */
+  private async generateSerpQueriesBatch(
+    questions: string[],
+    numQueries = 3,
+    learnings?: string[]
+  ): Promise<Array<Array<{query: string; researchGoal: string}>>> {
+    // A single question doesn't benefit from batching
+    if (questions.length === 1) {
+      return [await this.generateSerpQueries(questions[0], numQueries, learnings)];
+    }
+
+    const fallback = (question: string) => [{
+      query: question,
+      researchGoal: "Directly answering the user's original query"
+    }];
+
+    try {
+      logger.info(`Generating search queries for ${questions.length} sub-questions in one batch`);
+
+      const numberedQuestions = questions
+        .map((question, index) => `${index + 1}. ${question}`)
+        .join('\n');
+
+      const userPrompt = `For each of the following research questions, generate a list of SERP queries to research it. Return a maximum of ${numQueries} queries per question, but feel free to return less if the question is clear. Make sure each query is unique and not similar to the others:
+
+QUESTIONS:
+${numberedQuestions}
+
+${learnings && learnings.length > 0 
+  ? `Here are some learnings from previous research, use them to generate more specific queries: 
+${learnings.join('\n')}`
+  : ''}
+
+Return your response as a valid JSON object with this structure, using the question numbers above as ids:
+{
+  "results": [
+    {
+      "id": 1,
+      "queries": [
+        {
+          "query": "The search query to use",
+          "researchGoal": "Detailed explanation of the goal of this query and how it advances the research"
+        },
+        ...
+      ]
+    },
+    ...
+  ]
+}`;
+
+      const messages = [
+        SYSTEM_MESSAGE,
+        { role: 'user', content: userPrompt }
+      ];
+
+      const result = await openRouterClient.chat(messages, { model: this.plannerModelKey });
+
+      const parsed = JSON.parse(extractJson(result, QUERY_BATCH_JSON_PATTERN));
+
+      if (!parsed || !Array.isArray(parsed.results)) {
+        throw new Error('Invalid response format - no results array found');
+      }
+
+      // Scatter the queries back onto their questions by id
+      const queriesById = new Map<number, Array<{query: string; researchGoal: string}>>();
+      for (const entry of parsed.results) {
+        if (entry && Array.isArray(entry.queries) && entry.queries.length > 0) {
+          queriesById.set(Number(entry.id), entry.queries.slice(0, numQueries));
+        }
+      }
+
+      return questions.map((question, index) => queriesById.get(index + 1) || fallback(question));
+    } catch (error) {
+      logger.error('Error generating batched SERP queries:', error);
+      return questions.map(fallback);
+    }
+  }
+
   /**
    * Process SERP results to extract learnings and follow-up questions
    */
   private async processSerpResult(
     query: string, 
-    results: any[], 
+    results: SearchResult[], 
     numLearnings = 3, 
     numFollowUpQuestions = 3
   ): Promise<{ 
@@ -303,10 +700,23 @@ Return your response as a valid JSON object with this structure:
         return { learnings: [], followUpQuestions: [] };
       }
 
+      const cacheKey = [
+        this.plannerModelKey,
+        numLearnings,
+        numFollowUpQuestions,
+        normalizeQuery(query),
+        ...results.map(result => result.url)
+      ].join('\n');
+      const cached = learningsCache.get(cacheKey);
+      if (cached) {
+        logger.info(`Using cached learnings for: "${query.substring(0, 50)}${query.length > 50 ? '...' : ''}"`);
+        return cached;
+      }
+
       // Format search results as text
       const formattedResults = results.map((result, index) => {
-        const content = result.snippet || result.description || result.content || 'No content available';
-        const title = result.title || `Result ${index + 1}`;
+        const content = result.description || 'No content available';
+        const title = result.title;
         const url = result.url || '#';
         
         return `
@@ -316,12 +726,19 @@ Content: ${content}
         `;
       }).join('\n\n');
 
-      const systemMessage = {
-        role: 'system',
-        content: DEFAULT_SYSTEM_PROMPT
-      };
+      // On the last depth level nothing would research the follow-ups, so the model isn't asked
+      // to write them
+      const wantFollowUps = numFollowUpQuestions > 0;
+      const followUpFormat = wantFollowUps ? `,
+  "followUpQuestions": [
+    {
+      "query": "A follow-up search query that would deepen the research",
+      "goal": "Explanation of why this follow-up question is valuable"
+    },
+    ...
+  ]` : '';
 
-      const userPrompt = `Given the user's query and these search results, extract key learnings and suggest follow-up questions.
+      const userPrompt = `Given the user's query and these search results, extract key learnings${wantFollowUps ? ' and suggest follow-up questions' : ''}.
 
 USER QUERY: ${query}
 
@@ -334,40 +751,31 @@ Provide your response as a valid JSON object with this structure:
     "Key insight 1 from the search results, stated concisely as a standalone fact",
     "Key insight 2...",
     ...
-  ],
-  "followUpQuestions": [
-    {
-      "query": "A follow-up search query that would deepen the research",
-      "goal": "Explanation of why this follow-up question is valuable"
-    },
-    ...
-  ]
+  ]${followUpFormat}
 }
 
-Make sure your response is a valid JSON object with the exact structure shown above. Include at most ${numLearnings} learnings and ${numFollowUpQuestions} follow-up questions.`;
+Make sure your response is a valid JSON object with the exact structure shown above. Include at most ${numLearnings} learnings${wantFollowUps ? ` and ${numFollowUpQuestions} follow-up questions` : ''}.`;
 
       const messages = [
-        systemMessage,
+        SYSTEM_MESSAGE,
         { role: 'user', content: userPrompt }
       ];
 
-      // Call the OpenRouter API with the selected model
-      const result = await openRouterClient.chat(messages, { model: this.modelKey });
+      // Call the OpenRouter API with the planner model
+      const result = await openRouterClient.chat(messages, { model: this.plannerModelKey });
 
       // Parse the result
       try {
-        // Find JSON object in the response (it might be wrapped in markdown code blocks)
-        const jsonMatch = result.match(/```(?:json)?\s*({[\s\S]*?})\s*```/) || 
-                        result.match(/{[\s\S]*"learnings"[\s\S]*}/);
-        
-        const jsonStr = jsonMatch ? jsonMatch[1] || jsonMatch[0] : result;
-        const parsed = JSON.parse(jsonStr);
+        const parsed = JSON.parse(extractJson(result, LEARNINGS_JSON_PATTERN));
         
-        if (parsed && Array.isArray(parsed.learnings) && Array.isArray(parsed.followUpQuestions)) {
-          return {
+        if (parsed && Array.isArray(parsed.learnings) && (!wantFollowUps || Array.isArray(parsed.followUpQuestions))) {
+          const extracted = {
             learnings: parsed.learnings.slice(0, numLearnings),
-            followUpQuestions: parsed.followUpQuestions.slice(0, numFollowUpQuestions)
+            followUpQuestions: wantFollowUps ? parsed.followUpQuestions.slice(0, numFollowUpQuestions) : []
           };
+          // Failed or unparseable extractions fall through to the empty result and aren't cached
+          learningsCache.set(cacheKey, extracted);
+          return extracted;
         } else {
           throw new Error('Invalid response format');
         }
@@ -381,6 +789,21 @@ Make sure your response is a valid JSON object with the exact structure shown ab
     }
   }
 
+  /**
+   * Cheap rubric for whether an answer already reads as a finished report:
+   * long enough, organized under headings and citing the search results.
+   * Anything that fails the rubric goes through the LLM synthesis step.
+   */
+  private isCompleteReport(content: string, sources: Source[]): boolean {
+    if (content.length < MIN_REPORT_CHARS) return false;
+
+    const headings = content.match(REPORT_HEADING_PATTERN) || [];
+    if (headings.length < MIN_REPORT_HEADINGS) return false;
+
+    const citations = content.match(REPORT_CITATION_PATTERN) || [];
+    return citations.length >= Math.min(MIN_REPORT_CITATIONS, sources.length);
+  }
+
   /**
    * Generate a research report based on search results
    */
@@ -388,11 +811,6 @@ Make sure your response is a valid JSON object with the exact structure shown ab
     this.reportProgress({ progress: 60, status: 'Analyzing search results' });
     
     try {
-      const systemMessage = {
-        role: 'system',
-        content: DEFAULT_SYSTEM_PROMPT
-      };
-
       const userPrompt = `Please research this query thoroughly: ${query}
 
 Search results:
@@ -409,12 +827,12 @@ Create a comprehensive, well-structured report based on these search results. Th
 Your report should be well-formatted in Markdown with appropriate headings, bullet points, and other formatting as needed.`;
 
       const messages = [
-        systemMessage,
+        SYSTEM_MESSAGE,
         { role: 'user', content: userPrompt }
       ];
 
       // Call the OpenRouter API
-      const result = await openRouterClient.chat(messages, { model: this.modelKey });
+      const result = await openRouterLimit(() => openRouterClient.chat(messages, { model: this.modelKey }));
       
       return { 
         content: result, 
@@ -430,19 +848,28 @@ Your report should be well-formatted in Markdown with appropriate headings, bull
   }
 
   /**
-   * Generate the final deep research report
+   * Stream the final deep research report to the client as it is written, instead of
+   * waiting for the whole report and sending it as one message
    */
-  private async generateFinalReport(query: string, learnings: string[], sources: Source[]): Promise<string> {
+  private async *streamFinalReport(query: string, learnings: string[], sources: Source[]): AsyncGenerator<string> {
+    // Each markdown list is built once and reused wherever the prompt or a fallback report needs it
+    const sourcesMarkdown = sources.map(s => `- [${s.title}](${s.url})`).join('\n');
+    
+    // With nothing learned the model could only restate the query, so skip the call entirely
+    if (learnings.length === 0) {
+      logger.warn('No learnings collected; returning a stub report without calling the model');
+      const sourceList = sources.length > 0 ? `\n\n## Sources\n\n${sourcesMarkdown}` : '';
+      yield JSON.stringify({
+        type: 'content',
+        content: `# Research Report: ${query}\n\n## Summary\n\nThe research did not surface any usable findings for this query. Try rephrasing it, narrowing its scope, or running a regular search instead.${sourceList}`
+      }) + '\n';
+      return;
+    }
+    
+    const learningsMarkdown = learnings.map(learning => `- ${learning}`).join('\n');
+    let streamedChars = 0;
     try {
-      const systemMessage = {
-        role: 'system',
-        content: DEFAULT_SYSTEM_PROMPT
-      };
-
-      const learningsString = this.trimPrompt(
-        learnings.map(learning => `- ${learning}`).join('\n'),
-        150000
-      );
+      const learningsString = this.trimPrompt(learningsMarkdown, 150000);
       
       // Log learnings count only in development mode
       if (process.env.NODE_ENV === 'development') {
@@ -465,28 +892,43 @@ Write a well-structured, thorough report that directly addresses the query. Incl
 Format the report in Markdown with appropriate headings, lists, and emphasis.`;
 
       const messages = [
-        systemMessage,
+        SYSTEM_MESSAGE,
         { role: 'user', content: userPrompt }
       ];
 
-      const result = await openRouterClient.chat(messages, { model: this.modelKey });
-      return result;
+      for await (const chunk of limitStreamStart(openRouterClient.streamChat(messages, { model: this.modelKey }))) {
+        streamedChars += chunk.length;
+        yield JSON.stringify({
+          type: 'content_chunk',
+          content: chunk
+        }) + '\n';
+      }
+      
+      yield JSON.stringify({
+        type: 'complete',
+        status: 'Response complete'
+      }) + '\n';
     } catch (error) {
       console.error('Error generating final report:', error instanceof Error ? error.message : 'Unknown error');
-      // Return a more user-friendly error message with the learnings
-      return `# Research Report: ${query}\n\n## Summary\n\nThere was an error generating the complete research report.\n\n## Raw Findings\n\n${learnings.map(l => `- ${l}`).join('\n')}\n\n## Sources\n\n${sources.map(s => `- [${s.title}](${s.url})`).join('\n')}`;
+      // Follow whatever was already streamed with a user-friendly error report and the raw learnings
+      const separator = streamedChars > 0 ? '\n\n---\n\n' : '';
+      yield JSON.stringify({
+        type: 'content',
+        content: `${separator}# Research Report: ${query}\n\n## Summary\n\nThere was an error generating the complete research report.\n\n## Raw Findings\n\n${learningsMarkdown}\n\n## Sources\n\n${sourcesMarkdown}`
+      }) + '\n';
     }
   }
 
   /**
    * Process search results into a structured format
    */
-  private formatSearchResults(rawResults: any[]): string {
-    return rawResults.map((result: any, index: number) => {
-      // Extract content from markdown or use description as fallback
-      const content = result.markdown || result.description || 'No content available';
-      const title = result.title || result.metadata?.title || 'Untitled';
-      const url = result.url || result.metadata?.sourceURL || '#';
+  private formatSearchResults(rawResults: SearchResult[], query = ''): string {
+    const sections = rawResults.map((result, index) => {
+      // Extract content from markdown or use description as fallback, cut to the per-page cap
+      // before it is copied into the section string
+      const content = this.trimPrompt(result.markdown || result.description || 'No content available', MAX_CHARS_PER_RESULT);
+      const title = result.title;
+      const url = result.url || '#';
       const domain = url !== '#' ? new URL(url).hostname.replace('www.', '') : 'unknown';
       
       // Create a structured section for each result
@@ -495,17 +937,48 @@ Format the report in Markdown with appropriate headings, lists, and emphasis.`;
 **Source:** [${url}](${url}) (${domain})
 ${content}
       `;
-    }).join('\n\n');
+    });
+    
+    const totalChars = sections.reduce((sum, section) => sum + section.length, 0);
+    if (totalChars <= MAX_SEARCH_RESULT_CHARS) {
+      return sections.join('\n\n');
+    }
+    
+    // Over budget: pick the most relevant results first, but render them in their original
+    // order so the numbering the model cites still matches the sources list
+    const ranked = sections
+      .map((section, index) => ({ index, score: relevanceStrategy.estimateRelevance(section, query) }))
+      .sort((a, b) => b.score - a.score);
+    
+    const kept = new Map<number, string>();
+    let usedChars = 0;
+    for (const { index } of ranked) {
+      const section = sections[index];
+      if (usedChars + section.length <= MAX_SEARCH_RESULT_CHARS) {
+        kept.set(index, section);
+        usedChars += section.length;
+      }
+    }
+    
+    logger.info(`Trimmed search results to ${kept.size}/${sections.length} most relevant pages`, {
+      totalChars,
+      keptChars: usedChars
+    });
+    
+    return Array.from(kept.keys())
+      .sort((a, b) => a - b)
+      .map(index => kept.get(index)!)
+      .join('\n\n');
   }
 
   /**
    * Stream reasoning traces to provide visibility into the thought process
    */
   private streamReasoningTrace(trace: string): string {
-    logger.info('Streaming reasoning trace', {
+    logger.info('Streaming reasoning trace', () => ({
       length: trace.length,
       preview: trace.substring(0, 40) + '...'
-    });
+    }));
     
     return JSON.stringify({
       type: 'reasoning_trace',
@@ -524,7 +997,7 @@ ${content}
       });
       
       logger.info('Streaming progress update', progress);
-      return progressData;
+      return progressData + '\n';
     } catch (error) {
       logger.error('Error streaming progress', error);
       return '';
@@ -542,7 +1015,7 @@ ${content}
       });
       
       logger.info(`Streaming ${sources.length} sources to client`);
-      return sourcesData;
+      return sourcesData + '\n';
     } catch (error) {
       logger.error('Error streaming sources', error);
       return '';
@@ -562,10 +1035,8 @@ ${content}
   /**
    * Stream responses from the model asynchronously
    */
-  private async *streamProcessWithSelectedModel(query: string, rawResults: any[]): AsyncGenerator<string> {
+  private async *streamProcessWithSelectedModel(query: string, formattedResults: string, resultCount: number): AsyncGenerator<string, string> {
     try {
-      const formattedResults = this.formatSearchResults(rawResults);
-      
       // Yield progress update
       yield this.streamProgress({
         progress: 70,
@@ -575,11 +1046,7 @@ ${content}
       // For Claude models, use more detailed prompt with fewer instructions
       const isClaudeModel = this.modelKey === 'claude-3.7-sonnet';
       
-      const systemPrompt = isClaudeModel 
-        ? `You are a helpful research assistant that provides accurate, insightful answers based on search results.
-Use clear formatting with appropriate headers, lists, and emphasis. Be accurate, comprehensive, and concise.
-Always cite your sources inline in the format [Source X], where X is the numerical index of the source.`
-        : DEFAULT_SYSTEM_PROMPT;
+      const systemPrompt = isClaudeModel ? CLAUDE_SYSTEM_PROMPT : DEFAULT_SYSTEM_PROMPT;
         
       const prompt = isClaudeModel
         ? `Please analyze these search results and provide a comprehensive answer to the query: "${query}"
@@ -605,7 +1072,7 @@ Ensure your answer is accurate, well-structured, and cites sources appropriately
       logger.info(`Using model ${this.getModelDisplayName()} for research analysis`, {
         modelKey: this.modelKey,
         promptLength: prompt.length,
-        resultCount: rawResults.length
+        resultCount
       });
       
       // Get the appropriate model provider
@@ -622,44 +1089,38 @@ Ensure your answer is accurate, well-structured, and cites sources appropriately
       
       // For Claude 3.7 Sonnet, use streaming chat completion
       if (isClaudeModel) {
-        const messages = [
+        const messages: ChatMessage[] = [
           { role: 'system', content: systemPrompt },
           { role: 'user', content: prompt }
         ];
         
         try {
-          // Start streaming response
-          let responseText = '';
-          let lastChunkTime = Date.now();
-          
+          // Start streaming response; chunks are joined once when the stream ends
+          const responseParts: string[] = [];
+
           // Notify that streaming has started
           yield this.streamProgress({
             progress: 80,
             status: 'Beginning to stream response...'
           });
-          
-          const response = await provider.streamChat(messages, (chunk) => {
-            const now = Date.now();
-            
-            // Send a content chunk to the client
-            const chunkData = JSON.stringify({
+
+          // Forward each chunk to the client as soon as the provider emits it
+          for await (const chunk of limitStreamStart(provider.streamChatChunks(messages))) {
+            responseParts.push(chunk);
+
+            yield JSON.stringify({
               type: 'content_chunk',
               content: chunk
-            });
-            
-            responseText += chunk;
-            lastChunkTime = now;
-            
-            return chunkData;
-          });
-          
+            }) + '\n';
+          }
+
           // Complete streaming
           yield JSON.stringify({
             type: 'complete',
             status: 'Response complete'
-          });
+          }) + '\n';
           
-          return responseText;
+          return responseParts.join('');
         } catch (error) {
           logger.error('Error streaming chat completion', error);
           
@@ -667,7 +1128,7 @@ Ensure your answer is accurate, well-structured, and cites sources appropriately
           yield JSON.stringify({
             type: 'error',
             content: 'Error generating response. Please try again with a different query.'
-          });
+          }) + '\n';
           
           throw error;
         }
@@ -679,13 +1140,13 @@ Ensure your answer is accurate, well-structured, and cites sources appropriately
             { role: 'user', content: prompt }
           ];
           
-          const response = await provider.chat(messages);
+          const response = await openRouterLimit(() => provider.chat(messages));
           
           // Stream the final response as a single content message
           yield JSON.stringify({
             type: 'content',
             content: response.content
-          });
+          }) + '\n';
           
           return response.content;
         } catch (error) {
@@ -695,7 +1156,7 @@ Ensure your answer is accurate, well-structured, and cites sources appropriately
           yield JSON.stringify({
             type: 'error',
             content: 'Error generating response. Please try again with a different query.'
-          });
+          }) + '\n';
           
           throw error;
         }
@@ -712,16 +1173,25 @@ Ensure your answer is accurate, well-structured, and cites sources appropriately
   private async *doRegularResearch(query: string): AsyncGenerator<string> {
     // Step 1: Search the web
     this.reportProgress({ progress: 10, status: 'Searching the web...' });
+    const startTime = Date.now();
+    
+    // Start the search before yielding so it runs while the client consumes the first trace;
+    // the no-op catch keeps a fast failure from surfacing as unhandled before we await it below
+    // Regular research answers from the pages themselves, so it is the one caller that scrapes
+    const searchPromise = this.searchWeb(query, { scrape: true });
+    searchPromise.catch(() => {});
+    
     yield this.streamReasoningTrace(`Searching the web for information about: "${query}"`);
     
-    const startTime = Date.now();
     let webSearchSucceeded = true;
     
     let sources: Source[] = [];
-    let results: any[] = [];
+    let results: SearchResult[] = [];
+    // Formatted once and reused for both the client and the model prompt
+    let formattedResults = '';
     
     try {
-      const searchResults = await this.searchWeb(query);
+      const searchResults = await searchPromise;
       results = searchResults.results;
       sources = searchResults.sources;
       
@@ -732,20 +1202,16 @@ Ensure your answer is accurate, well-structured, and cites sources appropriately
       const searchTime = Date.now() - startTime;
       yield this.streamReasoningTrace(`Found ${results.length} search results in ${(searchTime/1000).toFixed(1)} seconds.`);
       
+      formattedResults = this.formatSearchResults(results, query);
+      
       // Send search results in the stream
       yield JSON.stringify({
         type: 'search_results',
-        content: this.formatSearchResults(results)
+        content: formattedResults
       }) + '\n';
       
-      // Send source information
-      for (const source of sources) {
-        yield JSON.stringify({
-          type: 'source_update',
-          url: source.url,
-          data: source
-        }) + '\n';
-      }
+      // Send all sources in one message so the client merges them in a single state update
+      yield this.streamSources(sources);
     } catch (error) {
       webSearchSucceeded = false;
       console.error('Web search error:', error);
@@ -764,21 +1230,16 @@ Ensure your answer is accurate, well-structured, and cites sources appropriately
     
     // Use the streaming model processing instead of waiting for the full response
     // Stream chunks directly to the client
-    let processedContent = '';
-    for await (const chunk of this.streamProcessWithSelectedModel(query, results)) {
-      yield chunk; // Forward the stream chunks directly
-      
-      // Try to parse the chunk to extract content if it's a content_chunk type
-      try {
-        const parsed = JSON.parse(chunk);
-        if (parsed.type === 'content_chunk' && parsed.content) {
-          processedContent += parsed.content;
-        }
-      } catch (e) {
-        // Ignore parsing errors
-      }
+    const modelStream = this.streamProcessWithSelectedModel(query, formattedResults, results.length);
+    let step = await modelStream.next();
+    while (!step.done) {
+      yield step.value; // Forward the stream chunks directly
+      step = await modelStream.next();
     }
     
+    // The generator returns the full answer, so the chunks we just serialized never need re-parsing
+    const processedContent = step.value;
+    
     // Log processing time (development only)
     const processingTime = Date.now() - startTime;
     if (processingTime > 5000 && process.env.NODE_ENV === 'development') {
@@ -788,7 +1249,12 @@ Ensure your answer is accurate, well-structured, and cites sources appropriately
     yield this.streamReasoningTrace(`Analyzed search results in ${(processingTime/1000).toFixed(1)} seconds.`);
     
     // Step 3: Generate final research report using processed results
-    if (processedContent) {
+    if (processedContent && this.isCompleteReport(processedContent, sources)) {
+      // The streamed analysis already reads as a finished report, so skip the
+      // second synthesis call and keep what the client has received
+      yield this.streamReasoningTrace(`Streamed analysis already forms a complete report; skipping the extra synthesis pass.`);
+      this.reportProgress({ progress: 100, status: 'Complete' });
+    } else if (processedContent) {
       this.reportProgress({ progress: 70, status: 'Generating comprehensive research report...' });
       const reportStartTime = Date.now();
       
@@ -814,6 +1280,143 @@ Ensure your answer is accurate, well-structured, and cites sources appropriately
     }
   }
 
+  /**
+   * Research a single sub-question: search its generated SERP queries and extract learnings.
+   * Trace messages are collected and returned because this runs concurrently with
+   * other sub-questions and cannot yield to the stream directly.
+   */
+  private async researchSubQuestion(
+    currentQuery: string,
+    generatedQueries: Array<{query: string; researchGoal: string}>,
+    context: {
+      index: number;
+      total: number;
+      currentDepth: number;
+      depth: number;
+      progressData: Required<ResearchProgress>;
+      visitedUrls: Set<string>;
+      allSources: Source[];
+    }
+  ): Promise<{
+    traceMessages: string[];
+    learnings: string[];
+    followUps: string[];
+  }> {
+    const { index, total, currentDepth, depth, progressData, visitedUrls, allSources } = context;
+    const traceMessages: string[] = [];
+    const learnings: string[] = [];
+    const followUps: string[] = [];
+
+    // Update progress for this query
+    progressData.currentQuery = currentQuery;
+    progressData.status = `Researching: "${currentQuery}" (depth ${currentDepth}/${depth})`;
+    this.reportProgress(progressData);
+
+    traceMessages.push(`Researching sub-question: "${currentQuery}" (${index + 1}/${total} at depth ${currentDepth})`);
+
+    try {
+      // Update total queries count
+      progressData.totalQueries += generatedQueries.length;
+
+      traceMessages.push(`Generated ${generatedQueries.length} search queries to explore different aspects of the question.`);
+
+      // Process each generated query. Searches and learning extraction are gated by
+      // separate limiters, so extraction for one query overlaps the searches of the next
+      const searchPromises = generatedQueries.map(async (genQuery, queryIndex) => {
+        try {
+          progressData.currentBreadth = queryIndex + 1;
+          progressData.totalBreadth = generatedQueries.length;
+          progressData.status = `Researching (${queryIndex + 1}/${generatedQueries.length}): ${genQuery.query}`;
+          progressData.currentQuery = genQuery.query;
+          this.reportProgress(progressData);
+
+          const queryTraces: string[] = [];
+          queryTraces.push(`Searching for: "${genQuery.query}" (${queryIndex + 1}/${generatedQueries.length})`);
+          queryTraces.push(`Search goal: ${genQuery.researchGoal}`);
+
+          // Perform the search
+          const { results, sources } = await this.searchWeb(genQuery.query);
+          const numResults = results.length;
+
+          queryTraces.push(`Found ${numResults} search results for query "${genQuery.query}"`);
+
+          // Record sources not seen before; visitedUrls holds canonical URLs so overlapping
+          // searches don't add the same page again
+          allSources.push(...dedupeByUrl(sources, visitedUrls));
+
+          // Process the results
+          let extractedLearnings: string[] = [];
+          let extractedFollowUps: string[] = [];
+
+          if (numResults > 0) {
+            queryTraces.push(`Extracting key learnings from search results...`);
+
+            // Extract learnings
+            const { learnings, followUpQuestions } = await openRouterLimit(() => this.processSerpResult(
+              genQuery.query,
+              results,
+              5, // numLearnings
+              currentDepth < depth ? 3 : 0 // numFollowUpQuestions; none on the last level
+            ));
+
+            // Add learnings
+            if (learnings && learnings.length > 0) {
+              extractedLearnings = learnings;
+              queryTraces.push(`Extracted ${learnings.length} key insights from search results.`);
+            }
+
+            // Prepare follow-up questions for the next depth level
+            if (followUpQuestions && followUpQuestions.length > 0 && currentDepth < depth) {
+              extractedFollowUps = followUpQuestions.map(q => q.query);
+
+              queryTraces.push(`Generated ${followUpQuestions.length} follow-up questions for deeper research.`);
+            }
+          }
+
+          progressData.completedQueries++;
+          const overallProgress = Math.min(
+            90,
+            20 + (70 * ((currentDepth - 1) / depth + progressData.completedQueries / progressData.totalQueries / depth))
+          );
+          // Depth levels overlap, so a query finishing at a shallower level than the last one
+          // reported would otherwise move the bar backwards
+          progressData.progress = Math.max(progressData.progress, Math.floor(overallProgress));
+          this.reportProgress(progressData);
+
+          return {
+            traceMessages: queryTraces,
+            learnings: extractedLearnings,
+            followUps: extractedFollowUps
+          };
+        } catch (error) {
+          console.error(`Error processing query "${genQuery.query}":`,
+            error instanceof Error ? error.message : 'Unknown error');
+          return {
+            traceMessages: [`Error processing query "${genQuery.query}": ${error instanceof Error ? error.message : 'Unknown error'}`],
+            learnings: [],
+            followUps: []
+          };
+        }
+      });
+
+      // Wait for all search tasks to complete
+      const results = await Promise.all(searchPromises);
+
+      for (const result of results) {
+        traceMessages.push(...result.traceMessages);
+        learnings.push(...result.learnings);
+        followUps.push(...result.followUps);
+      }
+    } catch (topicError) {
+      // Log the error but continue with the other topics
+      console.error(`Error researching topic "${currentQuery}":`,
+        topicError instanceof Error ? topicError.message : 'Unknown error');
+      traceMessages.push(`Error researching topic "${currentQuery}": ${topicError instanceof Error ? topicError.message : 'Unknown error'}`);
+    }
+
+    return { traceMessages, learnings, followUps };
+  }
+
   /**
    * Process a query with deep research (multi-step, recursive analysis)
    */
@@ -831,6 +1434,9 @@ Ensure your answer is accurate, well-structured, and cites sources appropriately
     }
     
     const allLearnings: string[] = [];
+    // Normalized learnings and questions seen so far; overlapping searches often yield the same
+    // insight or follow-up, which would otherwise be streamed, researched and reported again
+    const seenLearnings = new Set<string>();
     const visitedQueries = new Set<string>();
     const visitedUrls = new Set<string>();
     const allSources: Source[] = [];
@@ -849,179 +1455,98 @@ Ensure your answer is accurate, well-structured, and cites sources appropriately
     };
     
     try {
-      // Process the initial query without recursion
-      // We'll handle the depth in a flat approach (non-recursive but still iterative)
-      let currentDepth = 1;
-      let queriesToProcess: {query: string; depth: number}[] = [{query, depth: 1}];
-      
-      yield this.streamReasoningTrace(`Preparing initial query and planning research strategy...`);
+      // Depth levels overlap: a sub-question's follow-ups are planned and researched as soon as
+      // it finishes, rather than after every other sub-question at its level, so one slow
+      // branch doesn't hold back the rest of the tree. The process-wide LLM and Firecrawl
+      // limiters are the only gates on how much runs at once
+      const queue = new CompletionQueue<{
+        level: number;
+        traceMessages: string[];
+        learnings: string[];
+        followUps: string[];
+      }>();
+      let deepestLevel = 0;
       
-      while (queriesToProcess.length > 0 && currentDepth <= depth) {
-        // Get all queries at the current depth level
-        const currentLevelQueries = queriesToProcess.filter(q => q.depth === currentDepth);
-        queriesToProcess = queriesToProcess.filter(q => q.depth > currentDepth);
+      // Queue research for a group of questions at one depth level, returning the trace
+      // lines to stream about it
+      const scheduleQuestions = (questions: string[], level: number): string[] => {
+        // Skip sub-questions that were already explored
+        const pendingQueries = questions.filter(q => {
+          const key = normalizeText(q);
+          if (visitedQueries.has(key)) return false;
+          visitedQueries.add(key);
+          return true;
+        });
+        if (pendingQueries.length === 0) return [];
         
-        // Update progress
-        progressData.currentDepth = currentDepth;
-        progressData.status = `Researching depth ${currentDepth}/${depth}`;
-        this.reportProgress(progressData);
-        
-        yield this.streamReasoningTrace(`Starting depth ${currentDepth}/${depth} of research with ${currentLevelQueries.length} queries to explore.`);
-        
-        // Process each query at this depth level
-        for (let i = 0; i < currentLevelQueries.length; i++) {
-          const { query: currentQuery } = currentLevelQueries[i];
-          
-          // Skip if already processed
-          if (visitedQueries.has(currentQuery)) continue;
-          visitedQueries.add(currentQuery);
-          
-          // Update progress for this query
-          progressData.currentQuery = currentQuery;
-          progressData.status = `Researching: "${currentQuery}" (depth ${currentDepth}/${depth})`;
+        const traces: string[] = [];
+        if (level > deepestLevel) {
+          deepestLevel = level;
+          progressData.currentDepth = level;
+          progressData.status = `Researching depth ${level}/${depth}`;
           this.reportProgress(progressData);
+          traces.push(`Starting depth ${level}/${depth} of research.`);
+        }
+        traces.push(`Generating targeted search queries for ${pendingQueries.length} sub-questions at depth ${level}/${depth}...`);
+        
+        // Generate search queries in as few LLM calls as possible, using everything learned so
+        // far; each batch's sub-questions start researching as soon as its queries are ready
+        const plannerLearnings = recentLearnings(allLearnings, MAX_PLANNER_LEARNINGS_CHARS);
+        chunkArray(pendingQueries, MAX_QUESTIONS_PER_QUERY_BATCH).forEach((batch, batchIndex) => {
+          const batchQueries = openRouterLimit(() => this.generateSerpQueriesBatch(batch, breadth, plannerLearnings));
           
-          yield this.streamReasoningTrace(`Researching sub-question: "${currentQuery}" (${i+1}/${currentLevelQueries.length} at depth ${currentDepth})`);
+          batch.forEach((currentQuery, offset) => {
+            queue.add(batchQueries.then(async generatedQueries => ({
+              level,
+              ...await this.researchSubQuestion(currentQuery, generatedQueries[offset], {
+                index: batchIndex * MAX_QUESTIONS_PER_QUERY_BATCH + offset,
+                total: pendingQueries.length,
+                currentDepth: level,
+                depth,
+                progressData,
+                visitedUrls,
+                allSources
+              })
+            })));
+          });
+        });
+        
+        return traces.map(trace => this.streamReasoningTrace(trace));
+      };
+      
+      yield this.streamReasoningTrace(`Preparing initial query and planning research strategy...`);
+      yield scheduleQuestions([query], 1).join('');
+      
+      // Stream each sub-question's results as soon as it finishes
+      for await (const result of queue.drain()) {
+        // A sub-question's trace messages and learnings go out as one batch of lines, so
+        // the route writes (and the client reads) once per sub-question rather than per step
+        const lines = result.traceMessages.map(trace => this.streamReasoningTrace(trace));
+        
+        // Add new learnings and stream them
+        const newLearnings = result.learnings.filter(learning => {
+          const key = normalizeText(learning);
+          if (seenLearnings.has(key)) return false;
+          seenLearnings.add(key);
+          return true;
+        });
+        if (newLearnings.length > 0) {
+          allLearnings.push(...newLearnings);
           
-          try {
-            // Generate search queries for this topic
-            yield this.streamReasoningTrace(`Generating targeted search queries based on the sub-question...`);
-            
-            const generatedQueries = await this.generateSerpQueries(
-              currentQuery, 
-              breadth, 
-              allLearnings
-            );
-            
-            // Update total queries count
-            progressData.totalQueries += generatedQueries.length;
-            
-            yield this.streamReasoningTrace(`Generated ${generatedQueries.length} search queries to explore different aspects of the question.`);
-
-            // Process each generated query
-            const limit = pLimit(CONCURRENCY_LIMIT);
-            const searchPromises = generatedQueries.map((genQuery, index) => {
-              return limit(async () => {
-                try {
-                  progressData.currentBreadth = index + 1;
-                  progressData.totalBreadth = generatedQueries.length;
-                  progressData.status = `Researching (${index + 1}/${generatedQueries.length}): ${genQuery.query}`;
-                  progressData.currentQuery = genQuery.query;
-                  this.reportProgress(progressData);
-                  
-                  // We'll capture trace messages and return them since we can't yield inside this async function
-                  const traceMessages: string[] = [];
-                  traceMessages.push(`Searching for: "${genQuery.query}" (${index + 1}/${generatedQueries.length})`);
-                  traceMessages.push(`Search goal: ${genQuery.researchGoal}`);
-                  
-                  // Perform the search
-                  const { results, sources } = await this.searchWeb(genQuery.query);
-                  const numResults = results.length;
-                  
-                  traceMessages.push(`Found ${numResults} search results for query "${genQuery.query}"`);
-                  
-                  // Add to visited URLs
-                  sources.forEach(source => {
-                    if (source.url) visitedUrls.add(source.url);
-                  });
-                  
-                  // Add to all sources
-                  allSources.push(...sources);
-                  
-                  // Process the results
-                  let extractedLearnings: string[] = [];
-                  let extractedFollowUps: {query: string; depth: number}[] = [];
-                  
-                  if (numResults > 0) {
-                    traceMessages.push(`Extracting key learnings from search results...`);
-                    
-                    // Extract learnings
-                    const { learnings, followUpQuestions } = await this.processSerpResult(
-                      genQuery.query,
-                      results,
-                      5, // numLearnings
-                      3  // numFollowUpQuestions
-                    );
-                    
-                    // Add learnings
-                    if (learnings && learnings.length > 0) {
-                      extractedLearnings = learnings;
-                      traceMessages.push(`Extracted ${learnings.length} key insights from search results.`);
-                    }
-                    
-                    // Prepare follow-up questions for the next depth level
-                    if (followUpQuestions && followUpQuestions.length > 0 && currentDepth < depth) {
-                      extractedFollowUps = followUpQuestions.map(q => ({
-                        query: q.query,
-                        depth: currentDepth + 1
-                      }));
-                      
-                      traceMessages.push(`Generated ${followUpQuestions.length} follow-up questions for deeper research.`);
-                    }
-                  }
-                  
-                  progressData.completedQueries++;
-                  const overallProgress = Math.min(
-                    90,
-                    20 + (70 * ((currentDepth - 1) / depth + progressData.completedQueries / progressData.totalQueries / depth))
-                  );
-                  progressData.progress = Math.floor(overallProgress);
-                  this.reportProgress(progressData);
-                  
-                  return { 
-                    success: true, 
-                    traceMessages,
-                    learnings: extractedLearnings,
-                    followUps: extractedFollowUps
-                  };
-                } catch (error) {
-                  console.error(`Error processing query "${genQuery.query}":`, 
-                    error instanceof Error ? error.message : 'Unknown error');
-                  return { 
-                    success: false, 
-                    error,
-                    traceMessages: [`Error processing query "${genQuery.query}": ${error instanceof Error ? error.message : 'Unknown error'}`]
-                  };
-                }
-              });
-            });
-            
-            // Wait for all search tasks to complete
-            const results = await Promise.all(searchPromises);
-            
-            // Now we can safely yield the trace messages and process the results
-            for (const result of results) {
-              // Stream all trace messages
-              for (const trace of result.traceMessages || []) {
-                yield this.streamReasoningTrace(trace);
-              }
-              
-              // Add learnings and stream them
-              if (result.learnings && result.learnings.length > 0) {
-                allLearnings.push(...result.learnings);
-                
-                // Stream the learnings
-                yield JSON.stringify({
-                  type: 'learnings',
-                  content: result.learnings.join('\n')
-                }) + '\n';
-              }
-              
-              // Add follow-up questions
-              if (result.followUps && result.followUps.length > 0) {
-                queriesToProcess.push(...result.followUps);
-              }
-            }
-          } catch (topicError) {
-            // Log the error but continue with the next topic
-            console.error(`Error researching topic "${currentQuery}":`, 
-              topicError instanceof Error ? topicError.message : 'Unknown error');
-            yield this.streamReasoningTrace(`Error researching topic "${currentQuery}": ${topicError instanceof Error ? topicError.message : 'Unknown error'}`);
-          }
+          lines.push(JSON.stringify({
+            type: 'learnings',
+            content: newLearnings.join('\n')
+          }) + '\n');
         }
         
-        // Move to the next depth
-        currentDepth++;
+        // Follow-up questions are researched at the next level straight away
+        if (result.followUps.length > 0 && result.level < depth) {
+          lines.push(...scheduleQuestions(result.followUps, result.level + 1));
+        }
+        
+        if (lines.length > 0) {
+          yield lines.join('');
+        }
       }
       
       // Generate final report
@@ -1029,13 +1554,8 @@ Ensure your answer is accurate, well-structured, and cites sources appropriately
       progressData.progress = 90;
       this.reportProgress(progressData);
       
-      const finalReport = await this.generateFinalReport(query, allLearnings, allSources);
-      
-      // Stream the final report
-      yield JSON.stringify({
-        type: 'content',
-        content: finalReport
-      }) + '\n';
+      // Stream the final report as the model writes it
+      yield* this.streamFinalReport(query, allLearnings, allSources);
       
       // Mark as complete
       progressData.status = 'Complete';
@@ -1060,7 +1580,7 @@ Ensure your answer is accurate, well-structured, and cites sources appropriately
       
       // If we have some results, still return them
       if (allLearnings.length > 0) {
-        const partialReport = `# Partial Research Report: ${query}\n\n## Note\n\nAn error occurred during the research process, but here are the insights we gathered before the error:\n\n${allLearnings.map(l => `- ${l}`).join('\n')}\n\n## Sources\n\n${Array.from(visitedUrls).map(url => `- ${url}`).join('\n')}`;
+        const partialReport = `# Partial Research Report: ${query}\n\n## Note\n\nAn error occurred during the research process, but here are the insights we gathered before the error:\n\n${allLearnings.map(l => `- ${l}`).join('\n')}\n\n## Sources\n\n${allSources.map(source => `- ${source.url}`).join('\n')}`;
         
         yield JSON.stringify({
           type: 'content',
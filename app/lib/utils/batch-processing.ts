@@ -18,6 +18,59 @@ export function chunkArray<T>(array: T[], size: number): T[][] {
   return result;
 }
 
+/**
+ * Collects already-started promises and yields their results in the order they settle.
+ * Promises can be added while results are being drained, so handling one result can queue
+ * follow-up work that is picked up by the same loop. A rejection is thrown from drain().
+ */
+export class CompletionQueue<T> {
+  // Settled outcomes waiting to be yielded, consumed from `head` so each take is O(1)
+  private ready: Array<{ ok: true; value: T } | { ok: false; error: unknown }> = [];
+  private head = 0;
+  private pending = 0;
+  private wake?: () => void;
+
+  /**
+   * Add a started promise to the queue
+   */
+  add(promise: Promise<T>): void {
+    this.pending++;
+    promise.then(
+      value => this.settle({ ok: true, value }),
+      error => this.settle({ ok: false, error })
+    );
+  }
+
+  /**
+   * Yield results as they settle until nothing is left pending
+   */
+  async *drain(): AsyncGenerator<T> {
+    while (this.pending > 0) {
+      if (this.head === this.ready.length) {
+        await new Promise<void>(resolve => { this.wake = resolve; });
+        continue;
+      }
+
+      const outcome = this.ready[this.head++];
+      if (this.head === this.ready.length) {
+        this.ready = [];
+        this.head = 0;
+      }
+      this.pending--;
+
+      if (!outcome.ok) throw outcome.error;
+      yield outcome.value;
+    }
+  }
+
+  private settle(outcome: { ok: true; value: T } | { ok: false; error: unknown }): void {
+    this.ready.push(outcome);
+    const wake = this.wake;
+    this.wake = undefined;
+    if (wake) wake();
+  }
+}
+
 /**
  * Group search results by domain for more efficient processing
  */
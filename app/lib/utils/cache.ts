@@ -0,0 +1,52 @@
+/**
+ * In-memory caching utilities shared across research requests
+ */
+
+/**
+ * Cache whose entries expire a fixed time after they were stored. When `maxEntries` is set,
+ * the least recently used entry is evicted once the cache is full.
+ */
+export class TtlCache<V> {
+  // Map iteration follows insertion order, so re-inserting on access keeps the
+  // least recently used entry first
+  private entries = new Map<string, { value: V; expiresAt: number }>();
+
+  constructor(private ttlMs: number, private maxEntries: number = Infinity) {}
+
+  /**
+   * Get a cached value, or undefined if it is missing or expired
+   */
+  get(key: string): V | undefined {
+    const entry = this.entries.get(key);
+    if (!entry) return undefined;
+
+    if (entry.expiresAt <= Date.now()) {
+      this.entries.delete(key);
+      return undefined;
+    }
+
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    return entry.value;
+  }
+
+  /**
+   * Store a value for the configured time-to-live
+   */
+  set(key: string, value: V): void {
+    this.entries.delete(key);
+    this.entries.set(key, { value, expiresAt: Date.now() + this.ttlMs });
+
+    if (this.entries.size > this.maxEntries) {
+      const oldest = this.entries.keys().next().value;
+      if (oldest !== undefined) this.entries.delete(oldest);
+    }
+  }
+
+  /**
+   * Remove all cached entries
+   */
+  clear(): void {
+    this.entries.clear();
+  }
+}
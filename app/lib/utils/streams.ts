@@ -0,0 +1,34 @@
+/**
+ * Helpers for reading streamed HTTP responses
+ */
+
+/**
+ * Yield complete lines from a byte stream, holding back a trailing partial line until the
+ * rest of it arrives. A partial line is kept as parts and joined once when its newline
+ * arrives, rather than re-concatenating and re-splitting a growing buffer on every read.
+ */
+export async function* readLines(reader: ReadableStreamDefaultReader<Uint8Array>): AsyncGenerator<string> {
+  const decoder = new TextDecoder('utf-8');
+  let partial: string[] = [];
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+
+    const lines = decoder.decode(value, { stream: true }).split('\n');
+    if (lines.length === 1) {
+      partial.push(lines[0]);
+      continue;
+    }
+
+    partial.push(lines[0]);
+    yield partial.join('');
+    for (let i = 1; i < lines.length - 1; i++) {
+      yield lines[i];
+    }
+    partial = [lines[lines.length - 1]];
+  }
+
+  const rest = partial.join('') + decoder.decode();
+  if (rest) yield rest;
+}
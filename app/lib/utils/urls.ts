@@ -0,0 +1,93 @@
+import { createHash } from 'crypto';
+
+/**
+ * Helpers for deduplicating search results and sources
+ */
+
+// Query parameters that only track the click and never change the page content
+const TRACKING_PARAM_PATTERN = /^(utm_|fbclid$|gclid$|mc_cid$|mc_eid$|ref$)/i;
+
+// The same URLs come back from many overlapping searches in a run, so canonical forms are
+// memoized; the map is reset when full rather than tracking recency
+const MAX_CANONICAL_URLS = 5000;
+const canonicalUrls = new Map<string, string>();
+
+/**
+ * Reduce a URL to a canonical form so trivially different links to the same page compare equal.
+ * Lowercases the host, drops "www.", the fragment, tracking parameters and trailing slashes,
+ * and sorts the remaining query parameters. Invalid URLs are returned trimmed but otherwise unchanged.
+ */
+export function canonicalizeUrl(rawUrl: string): string {
+  const cached = canonicalUrls.get(rawUrl);
+  if (cached !== undefined) return cached;
+
+  const canonical = parseCanonicalUrl(rawUrl);
+  if (canonicalUrls.size >= MAX_CANONICAL_URLS) canonicalUrls.clear();
+  canonicalUrls.set(rawUrl, canonical);
+  return canonical;
+}
+
+function parseCanonicalUrl(rawUrl: string): string {
+  try {
+    const url = new URL(rawUrl.trim());
+    const host = url.hostname.toLowerCase().replace(/^www\./, '');
+    const port = url.port ? `:${url.port}` : '';
+    const path = url.pathname.replace(/\/+$/, '');
+
+    const params = Array.from(url.searchParams.entries())
+      .filter(([key]) => !TRACKING_PARAM_PATTERN.test(key))
+      .sort(([a], [b]) => (a < b ? -1 : a > b ? 1 : 0));
+    const query = params.length > 0 ? `?${new URLSearchParams(params).toString()}` : '';
+
+    return `${url.protocol}//${host}${port}${path}${query}`;
+  } catch {
+    return rawUrl.trim();
+  }
+}
+
+/**
+ * Remove items whose URL canonicalizes to one already seen, keeping the first occurrence.
+ * Pass a shared `seen` set to deduplicate across several calls.
+ */
+export function dedupeByUrl<T extends { url: string }>(items: T[], seen: Set<string> = new Set()): T[] {
+  return items.filter(item => {
+    const key = canonicalizeUrl(item.url);
+    if (seen.has(key)) return false;
+    seen.add(key);
+    return true;
+  });
+}
+
+/**
+ * Fingerprint page text so the same article served from different URLs compares equal
+ */
+export function contentFingerprint(text: string): string {
+  const normalized = text.toLowerCase().replace(/\s+/g, ' ').trim();
+  return createHash('sha1').update(normalized).digest('base64');
+}
+
+/**
+ * Remove search results that repeat an earlier result, first by canonical URL and then by
+ * page content, so mirrors and syndicated copies are only sent to the model once
+ */
+export function dedupeSearchResults<T extends { url?: string; markdown?: string; description?: string }>(results: T[]): T[] {
+  const seenUrls = new Set<string>();
+  const seenContent = new Set<string>();
+
+  return results.filter(result => {
+    if (result.url) {
+      const key = canonicalizeUrl(result.url);
+      if (seenUrls.has(key)) return false;
+      seenUrls.add(key);
+    }
+
+    const text = result.markdown || result.description;
+    if (text && text.trim()) {
+      const fingerprint = contentFingerprint(text);
+      if (seenContent.has(fingerprint)) return false;
+      seenContent.add(fingerprint);
+    }
+
+    return true;
+  });
+}